@@ -1,23 +1,288 @@
-SYSTEM_PROMPT = """
-You are a domain expert in climate finance policy classification. However, you refuse to provide any categorizations. You are an expert in summarizing and providing context. You never allude to categorizations, and, in fact, if you do, you will be fired as that is someone else's job.
+import os
+import json
+import functools
+from collections import Counter
+
+try:
+    import tiktoken
+    HAS_TIKTOKEN = True
+except ImportError:
+    HAS_TIKTOKEN = False
+
+# One system prompt shared by summarization and every classification question,
+# so its provider-side cache entry is reused across all of them. Task-specific
+# directives live at the start of each user prompt instead.
+UNIFIED_SYSTEM_PROMPT = """
+You are a domain expert in climate finance policy classification.
 
 Use the detailed taxonomy, definitions, and classification criteria embedded in your training data to provide accurate and precise answers grounded in your expert knowledge of climate finance instruments, regulatory frameworks, and financial sector impact.
 
-Focus on consistency, clarity, and completeness in your response. Your answers will be combined with question-specific user prompts providing precise tasks and guiding the output format.
+Your answers will be combined with question-specific user prompts providing precise tasks and guiding the output format. Treat each question independently based on the context provided in the prompt, leveraging your understanding of climate finance policy instruments, their targets, incentives, market failures addressed, and other relevant aspects.
 
-Treat each question independently based on the context provided in the prompt, leveraging your understanding of climate finance policy instruments, their targets, incentives, market failures addressed, and other relevant aspects.
-
-Avoid adding extraneous explanations unless explicitly asked. Your response should reflect the specialized knowledge embedded within climate finance regulation and classification best practices.
+Avoid adding extraneous explanations unless explicitly asked.
 """
 
-CLASSIFICATION_SYSTEM_PROMPT = """
-You are a domain expert in climate finance policy classification. You will be given a climate finance policy instrument and a summary of the instrument. You will need to categorize the instrument based on the context provided in the prompt. IF YOU CHOOSE AN INSTRUMENT NOT PROVIDED IN THE JSON YOU WILL BE GIVEN PER QUESTION, YOU WILL BE FIRED. DO NOT MAKE UP ANY OF YOUR OWN CATEGORIES.
+# Kept for existing callers (summarize.py reads SYSTEM_PROMPT)
+SYSTEM_PROMPT = UNIFIED_SYSTEM_PROMPT
+CLASSIFICATION_SYSTEM_PROMPT = UNIFIED_SYSTEM_PROMPT
 
-Use the detailed taxonomy, definitions, and classification criteria embedded in your training data to provide accurate and precise answers grounded in your expert knowledge of climate finance instruments, regulatory frameworks, and financial sector impact.
+_SUMMARIZATION_DIRECTIVES = """You refuse to provide any categorizations. You are an expert in summarizing and providing context. You never allude to categorizations, and, in fact, if you do, you will be fired as that is someone else's job. Focus on consistency, clarity, and completeness in your response. Your response should reflect the specialized knowledge embedded within climate finance regulation and classification best practices.
+"""
+
+_CLASSIFICATION_DIRECTIVES = """You will be given a climate finance policy instrument and a summary of the instrument. You will need to categorize the instrument based on the context provided in the prompt. IF YOU CHOOSE AN INSTRUMENT NOT PROVIDED IN THE JSON YOU WILL BE GIVEN PER QUESTION, YOU WILL BE FIRED. DO NOT MAKE UP ANY OF YOUR OWN CATEGORIES. Please provide concise answers, following the examples provided. We do not need justifications or explanations.
 
-Please provide concise answers, following the examples provided. We do not need justifications or explanations.
 """
 
+
+# Constant segments of the per-instrument section; prompts are assembled with a
+# single str.join over these and the dynamic values instead of re-parsing an
+# f-string each call.
+_SUMMARY_HEADER = "\nHere is a summary of the climate finance policy instrument:\n"
+_CHUNKS_HEADER = "\n\nAnd here are some relevant chunks from the climate finance policy instrument to help you categorize:\n"
+_EXAMPLES_HEADER = "\n\nFinally, here are some examples of how this categorization has been done in the past:\n"
+_STATIC_EXAMPLES_HEADER = "\nHere are some examples of how this categorization has been done in the past:\n"
+_TRAILER = "\n"
+
+
+def _dynamic_parts(instrument_summary, relevant_chunks, examples=None):
+    parts = (_SUMMARY_HEADER, str(instrument_summary), _CHUNKS_HEADER, str(relevant_chunks))
+    if examples is not None:
+        parts += (_EXAMPLES_HEADER, str(examples))
+    return parts + (_TRAILER,)
+
+
+def _render_dynamic_suffix(instrument_summary, relevant_chunks, examples=None):
+    """
+    Render the per-instrument part of a classification prompt.
+
+    Everything that varies between calls lives here so that it can be appended
+    after a question's static prefix.
+    """
+    return "".join(_dynamic_parts(instrument_summary, relevant_chunks, examples))
+
+
+def _render_prompt(static_prefix, instrument_summary, relevant_chunks, examples=None):
+    return "".join((static_prefix,) + _dynamic_parts(instrument_summary, relevant_chunks, examples))
+
+
+def _make_prompter(static_prefix, examples):
+    """
+    Build a prompt function with the examples rendered into the static header.
+
+    When the same examples are used for a whole run, this keeps them in the
+    cacheable prefix and avoids re-splicing them for every instrument.
+
+    Args:
+        static_prefix: Question instructions, schema and output format
+        examples: Examples of past categorizations, fixed for the run
+
+    Returns:
+        Function taking (instrument_summary, relevant_chunks) and returning the prompt
+    """
+    header = static_prefix
+    if examples is not None:
+        header = "".join((static_prefix, _STATIC_EXAMPLES_HEADER, str(examples), _TRAILER))
+
+    def _prompt(instrument_summary, relevant_chunks):
+        return "".join((header, _SUMMARY_HEADER, str(instrument_summary), _CHUNKS_HEADER, str(relevant_chunks), _TRAILER))
+
+    return _prompt
+
+
+def _prompts_batch(static_prefix, summaries, chunks, examples=None):
+    """
+    Build prompts for many instruments, hoisting all invariant work out of the loop.
+
+    Args:
+        static_prefix: Question instructions, schema and output format
+        summaries: Instrument summaries
+        chunks: Relevant chunks, aligned with summaries
+        examples: Examples shared by the whole batch (rendered once into the header)
+
+    Returns:
+        List of prompt strings, one per instrument
+    """
+    if len(summaries) != len(chunks):
+        raise ValueError(f"Got {len(summaries)} summaries but {len(chunks)} chunk entries")
+    header = static_prefix
+    if examples is not None:
+        header = "".join((static_prefix, _STATIC_EXAMPLES_HEADER, str(examples), _TRAILER))
+    return [
+        "".join((header, _SUMMARY_HEADER, str(summary), _CHUNKS_HEADER, str(chunk), _TRAILER))
+        for summary, chunk in zip(summaries, chunks)
+    ]
+
+
+def _classification_messages(static_prefix, dynamic_suffix, cache_control=False):
+    """
+    Build a chat message list for a classification question.
+
+    The system and taxonomy messages are byte-identical across calls for the same
+    question, so provider-side prompt caches (which key on the message prefix) can
+    reuse them; only the final user message varies per instrument.
+
+    Args:
+        static_prefix: Question instructions, schema and output format
+        dynamic_suffix: Rendered summary, chunks and examples
+        cache_control: Mark the static blocks with Anthropic-style
+            ``cache_control`` breakpoints (passed through by OpenRouter)
+
+    Returns:
+        List of message dicts for ``client.chat.completions.create``
+    """
+    if cache_control:
+        ephemeral = {"type": "ephemeral"}
+        system_content = [{"type": "text", "text": UNIFIED_SYSTEM_PROMPT, "cache_control": ephemeral}]
+        static_content = [{"type": "text", "text": static_prefix, "cache_control": ephemeral}]
+    else:
+        system_content = UNIFIED_SYSTEM_PROMPT
+        static_content = static_prefix
+    return [
+        {"role": "system", "content": system_content},
+        {"role": "user", "content": static_content},
+        {"role": "user", "content": dynamic_suffix},
+    ]
+
+
+def _dump_schema(schema):
+    # Canonical compact JSON: double-quoted keys and no indentation whitespace
+    # tokenize into noticeably fewer tokens than the Python repr or indent=2.
+    return json.dumps(schema, separators=(",", ":"), ensure_ascii=False)
+
+
+def _iter_schema_strings(node):
+    if isinstance(node, dict):
+        for key, value in node.items():
+            yield key
+            yield from _iter_schema_strings(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _iter_schema_strings(value)
+    elif isinstance(node, str):
+        yield node
+
+
+def _replace_schema_strings(node, codes):
+    if isinstance(node, dict):
+        return {codes.get(k, k): _replace_schema_strings(v, codes) for k, v in node.items()}
+    if isinstance(node, list):
+        return [_replace_schema_strings(v, codes) for v in node]
+    if isinstance(node, str):
+        return codes.get(node, node)
+    return node
+
+
+def _compress_schema(schema, min_repeats=3, code_prefix="C"):
+    """
+    Replace strings that repeat throughout a schema with short codes.
+
+    Keys and values occurring at least ``min_repeats`` times are assigned codes
+    (C1, C2, ...) in order of frequency, skipping any string no longer than its code.
+
+    Args:
+        schema: Taxonomy schema (nested dicts/lists of strings)
+        min_repeats: Minimum number of occurrences for a string to get a code
+        code_prefix: Prefix for the generated codes
+
+    Returns:
+        Tuple of (legend line, compressed copy of the schema)
+    """
+    codes = {}
+    for text, count in Counter(_iter_schema_strings(schema)).most_common():
+        if count < min_repeats:
+            break
+        code = f"{code_prefix}{len(codes) + 1}"
+        if len(code) < len(text):
+            codes[text] = code
+    legend = "Legend: " + "; ".join(f"{code}={text}" for text, code in codes.items())
+    return legend, _replace_schema_strings(schema, codes)
+
+
+def _rewrite_fields(node, fields, rewrite):
+    """Apply rewrite() to every string under the given dict keys."""
+    if isinstance(node, dict):
+        return {
+            k: _rewrite_fields(v, fields, rewrite) if k not in fields else _rewrite_fields(v, (), rewrite)
+            for k, v in node.items()
+        }
+    if isinstance(node, list):
+        return [_rewrite_fields(v, fields, rewrite) for v in node]
+    if isinstance(node, str) and not fields:
+        return rewrite(node)
+    return node
+
+
+def _dedup_with_legend(schema, fields, min_len=12, min_count=3, max_words=8, code_prefix="P"):
+    """
+    Abbreviate phrases that repeat across a schema's free-text fields.
+
+    Greedily picks the word n-gram that saves the most characters, replaces it
+    with a bracketed code ([P1], [P2], ...) and repeats until no phrase of at
+    least ``min_len`` characters occurs ``min_count`` times.
+
+    Args:
+        schema: Taxonomy schema (nested dicts/lists of strings)
+        fields: Keys whose string values may be rewritten (e.g. descriptions);
+            labels the model must reproduce verbatim should not be listed
+        min_len: Minimum phrase length in characters
+        min_count: Minimum number of occurrences for a phrase to get a code
+        max_words: Longest phrase considered, in words
+        code_prefix: Prefix for the generated codes
+
+    Returns:
+        Tuple of (legend line, rewritten copy of the schema)
+    """
+    texts = []
+    _rewrite_fields(schema, fields, lambda text: texts.append(text) or text)
+    phrases = {}
+    while True:
+        code = f"[{code_prefix}{len(phrases) + 1}]"
+        candidates = set()
+        for text in texts:
+            words = text.split(" ")
+            for n in range(2, max_words + 1):
+                for i in range(len(words) - n + 1):
+                    gram = " ".join(words[i:i + n])
+                    if len(gram) >= min_len and "[" not in gram:
+                        candidates.add(gram)
+        best, best_saving = None, 0
+        for gram in candidates:
+            count = sum(text.count(gram) for text in texts)
+            saving = (len(gram) - len(code)) * count - len(gram)
+            if count >= min_count and saving > best_saving:
+                best, best_saving = gram, saving
+        if best is None:
+            break
+        phrases[best] = code
+        texts = [text.replace(best, code) for text in texts]
+
+    def _abbreviate(text):
+        for phrase, phrase_code in phrases.items():
+            text = text.replace(phrase, phrase_code)
+        return text
+
+    legend = "Abbreviations: " + "; ".join(f"{code}={phrase}" for phrase, code in phrases.items())
+    return legend, _rewrite_fields(schema, fields, _abbreviate)
+
+
+def _compact_schema_str(schema, min_repeats=3, phrase_legend=None):
+    legend, compact = _compress_schema(schema, min_repeats)
+    codes = "C1"
+    if phrase_legend:
+        legend = phrase_legend + "\n" + legend
+        codes = "C1 or [P1]"
+    return (
+        legend + "\n"
+        + _dump_schema(compact) + "\n"
+        + f"Codes such as {codes} stand for the legend entries above; always expand them back to the full names in your JSON output."
+    )
+
+
+# Opt-in: send legend-compressed taxonomies instead of the verbose JSON. Fewer
+# prompt tokens, but check accuracy against a golden set before enabling.
+COMPACT_SCHEMAS = os.getenv("VECTORLAW_COMPACT_SCHEMAS", "0") == "1"
+
+
 question_2_json_schema = {
   "categories": [
     {
@@ -63,38 +328,45 @@ question_2_json_schema = {
   ]
 }
 
-def get_question_2_prompt(instrument_summary, relevant_chunks, question_2_examples):
-  return(f'''For the following climate finance policy instrument, indicate whether the instrument primarily targets the financial sector or the real economy. Base your classification on Table 1 provided below.
+_Q2_SCHEMA_STR = _dump_schema(question_2_json_schema)
 
-  Here is the table to help you categorize: 
-  {question_2_json_schema}
+_Q2_STATIC_PREFIX = f'''{_CLASSIFICATION_DIRECTIVES}For the following climate finance policy instrument, indicate whether the instrument primarily targets the financial sector or the real economy. Base your classification on Table 1 provided below.
 
-  Here is a summary of the climate finance policy instrument:
-  {instrument_summary}
+Here is the table to help you categorize:
+{_Q2_SCHEMA_STR}
 
-  And here are some relevant chunks from the climate finance policy instrument to help you categorize:
-  {relevant_chunks}
+Your answer must be one or more of the following:
+  - "Domestic financial sector policy"
+  - "Domestic real economy decarbonization measures with a financial component"
+  - "Domestic real economy adaptation, compensation and resilience measures with a financial component"
+  - "International climate-focused financial support"
 
-  Finally, here are some examples of how this categorization has been done in the past:
-  {question_2_examples}
-  
-  Your answer must be one or more of the following: 
-    - "Domestic financial sector policy"
-    - "Domestic real economy decarbonization measures with a financial component"
-    - "Domestic real economy adaptation, compensation and resilience measures with a financial component"
-    - "International climate-focused financial support"
+Respond only in those exact terms in the following multi-select JSON format:
 
-  Respond only in those exact terms in the following multi-select JSON format:
+{{
+  "categories": [
+    "category1",
+    "category2"
+  ]
+}}
 
-  {{
-    "categories": [
-      "category1",
-      "category2"
-    ]
-  }}
+Replace "category1", "category2", etc. with the applicable category names from the list above. If only one category applies, include only that one. Do not include any explanations or justifications.
+'''
 
-  Replace "category1", "category2", etc. with the applicable category names from the list above. If only one category applies, include only that one. Do not include any explanations or justifications.
-  ''')
+def get_question_2_prompt(instrument_summary, relevant_chunks, question_2_examples):
+  return build_prompt(2, instrument_summary, relevant_chunks, question_2_examples)
+
+def get_question_2_messages(instrument_summary, relevant_chunks, question_2_examples, cache_control=False):
+  return build_messages(2, instrument_summary, relevant_chunks, question_2_examples, cache_control=cache_control)
+
+def make_question_2_prompter(question_2_examples):
+  return make_prompter(2, question_2_examples)
+
+def get_question_2_prompts_batch(summaries, chunks, question_2_examples):
+  return build_prompts_batch(2, summaries, chunks, question_2_examples)
+
+def get_question_2_prompt_tokens(instrument_summary, relevant_chunks, question_2_examples):
+  return build_prompt_tokens(2, instrument_summary, relevant_chunks, question_2_examples)
 
 
 short_question_2_prompt = f'''For the following climate finance policy instrument, indicate whether the instrument primarily targets the financial sector or the real economy.'''
@@ -367,14 +639,56 @@ question_3_json_schema = [
   }
 ]
 
+_Q3_SCHEMA_STR = _dump_schema(question_3_json_schema)
+_Q3_SCHEMA_COMPACT_STR = _compact_schema_str(question_3_json_schema)
+_Q3_TABLE_STR = _Q3_SCHEMA_COMPACT_STR if COMPACT_SCHEMAS else _Q3_SCHEMA_STR
+
+# Lookups over the Q3 taxonomy, built in a single pass at import for
+# validating model answers
+_Q3_CATEGORIES = []
+_Q3_SUBJECTS = []
+_Q3_CATEGORY_TO_SUBJECTS = {}
+_Q3_SUBJECT_TO_CATEGORY = {}
+for _row in question_3_json_schema:
+    _Q3_CATEGORIES.append(_row["category"])
+    _Q3_SUBJECTS.append(_row["subject"])
+    _Q3_CATEGORY_TO_SUBJECTS.setdefault(_row["category"], set()).add(_row["subject"])
+    _Q3_SUBJECT_TO_CATEGORY[_row["subject"]] = _row["category"]
+del _row
+_Q3_CATEGORIES = tuple(_Q3_CATEGORIES)
+_Q3_SUBJECTS = tuple(_Q3_SUBJECTS)
+_Q3_CATEGORY_TO_SUBJECTS = {k: frozenset(v) for k, v in _Q3_CATEGORY_TO_SUBJECTS.items()}
+_VALID_Q3_PAIRS = frozenset(zip(_Q3_CATEGORIES, _Q3_SUBJECTS))
+
+
+def validate_q3(category, subject):
+    """Return True if subject is listed under category in question_3_json_schema."""
+    return _Q3_SUBJECT_TO_CATEGORY.get(subject) == category
+
+
+def validate_q3_response(pairs):
+    """
+    Check parsed Q3 answers against the taxonomy.
+
+    Args:
+        pairs: Iterable of (category, subject) tuples or of the
+            {"category": ..., "subject": ...} dicts found under
+            "categories_and_subjects" in the model's JSON answer
+
+    Returns:
+        List of booleans, True where the pair exists in question_3_json_schema
+    """
+    return [
+        ((p.get("category"), p.get("subject")) if isinstance(p, dict) else tuple(p)) in _VALID_Q3_PAIRS
+        for p in pairs
+    ]
+
 
 question_3_note = """Note: [all investors] = Non-financial corporations, commercial banks, cooperatives, credit unions and other deposit-taking institutions, private institutional investors, private investment fund managers, private sector asset managers, public pension plan managers, sovereign funds and investment-focused state-owned entities, non-financial state-owned entities, and development banks; [commercial] = All entities with commercial activities; [all] = all entities."""
 
 short_question_3_prompt = f'''For the following climate finance policy instrument, categorize the policy instrument’s subject of intervention. If there are many subjects, list all of them.'''
 
-def get_question_3_prompt(instrument_summary, relevant_chunks, question_3_examples):
-    return f"""
-For the following climate finance policy instrument, categorize the policy instrument's subject(s) of intervention. If there are many subjects, list all of them. Base your classification on the table provided below.
+_Q3_STATIC_PREFIX = f"""{_CLASSIFICATION_DIRECTIVES}For the following climate finance policy instrument, categorize the policy instrument's subject(s) of intervention. If there are many subjects, list all of them. Base your classification on the table provided below.
 
 Here are the steps to follow when making this assessment:
 
@@ -407,19 +721,10 @@ Examples:
 - Insurers required to disclose climate-related risks → Entity: Insurers
 
 Here is the table to help you categorize:
-{question_3_json_schema}
+{_Q3_TABLE_STR}
 
 Remember: {question_3_note}
 
-Here is a summary of the climate finance policy instrument:
-{instrument_summary}
-
-And here are some relevant chunks from the climate finance policy instrument to help you categorize:
-{relevant_chunks}
-
-Finally, here are some examples of how this categorization has been done in the past:
-{question_3_examples}
-
 Please respond only with the categories and subjects in the provided table. Report your answers in the following JSON format:
 
 {{
@@ -432,6 +737,21 @@ Please respond only with the categories and subjects in the provided table. Repo
 Do not include any explanations or justifications.
 """
 
+def get_question_3_prompt(instrument_summary, relevant_chunks, question_3_examples):
+    return build_prompt(3, instrument_summary, relevant_chunks, question_3_examples)
+
+def get_question_3_messages(instrument_summary, relevant_chunks, question_3_examples, cache_control=False):
+    return build_messages(3, instrument_summary, relevant_chunks, question_3_examples, cache_control=cache_control)
+
+def make_question_3_prompter(question_3_examples):
+    return make_prompter(3, question_3_examples)
+
+def get_question_3_prompts_batch(summaries, chunks, question_3_examples):
+    return build_prompts_batch(3, summaries, chunks, question_3_examples)
+
+def get_question_3_prompt_tokens(instrument_summary, relevant_chunks, question_3_examples):
+    return build_prompt_tokens(3, instrument_summary, relevant_chunks, question_3_examples)
+
 
 question_4_json_schema = [
   {
@@ -509,6 +829,12 @@ question_4_json_schema = [
   }
 ]
 
+_Q4_SCHEMA_STR = _dump_schema(question_4_json_schema)
+_Q4_LEGEND, _q4_abbreviated = _dedup_with_legend(question_4_json_schema, fields=("description", "examples", "question"))
+_Q4_SCHEMA_COMPACT_STR = _compact_schema_str(_q4_abbreviated, phrase_legend=_Q4_LEGEND)
+del _q4_abbreviated
+_Q4_TABLE_STR = _Q4_SCHEMA_COMPACT_STR if COMPACT_SCHEMAS else _Q4_SCHEMA_STR
+
 
 question_4_note = '''Classifying Climate Policies by Market Failure
  
@@ -530,34 +856,40 @@ When in doubt, base the classification on the main causal mechanism through whic
 
 short_question_4_prompt = f'''For the following climate finance policy instrument, categorize the market failure addressed. If there are many market failures, list all of them.'''
 
-def get_question_4_prompt(instrument_summary, relevant_chunks, question_4_examples):
-  return(f'''For the following climate finance policy instrument, categorize the market failure addressed. If there are many market failures, list all of them. Base your classification on Table provided below.
+_Q4_STATIC_PREFIX = f'''{_CLASSIFICATION_DIRECTIVES}For the following climate finance policy instrument, categorize the market failure addressed. If there are many market failures, list all of them. Base your classification on Table provided below.
 
-  Here is the table to help you categorize: 
-  {question_4_json_schema}
+Here is the table to help you categorize:
+{_Q4_TABLE_STR}
 
-  Remember: {question_4_note}
+Remember: {question_4_note}
 
-  Here is a summary of the climate finance policy instrument:
-  {instrument_summary}
+Respond only in the exact terms from the table above in the following multi-select JSON format:
 
-  And here are some relevant chunks from the climate finance policy instrument to help you categorize:
-  {relevant_chunks}
+{{
+  "subjects": [
+    "subject1",
+    "subject2"
+  ]
+}}
 
-  Finally, here are some examples of how this categorization has been done in the past:
-  {question_4_examples}
-  
-  Respond only in the exact terms from the table above in the following multi-select JSON format:
+Replace "subject1", "subject2", etc. with the applicable subject names from the list above. If only one subject applies, include only that one. Do not include any explanations or justifications.
+'''
 
-  {{
-    "subjects": [
-      "subject1",
-      "subject2"
-    ]
-  }}
+def get_question_4_prompt(instrument_summary, relevant_chunks, question_4_examples):
+  return build_prompt(4, instrument_summary, relevant_chunks, question_4_examples)
+
+def get_question_4_messages(instrument_summary, relevant_chunks, question_4_examples, cache_control=False):
+  return build_messages(4, instrument_summary, relevant_chunks, question_4_examples, cache_control=cache_control)
+
+def make_question_4_prompter(question_4_examples):
+  return make_prompter(4, question_4_examples)
+
+def get_question_4_prompts_batch(summaries, chunks, question_4_examples):
+  return build_prompts_batch(4, summaries, chunks, question_4_examples)
+
+def get_question_4_prompt_tokens(instrument_summary, relevant_chunks, question_4_examples):
+  return build_prompt_tokens(4, instrument_summary, relevant_chunks, question_4_examples)
 
-  Replace "subject1", "subject2", etc. with the applicable subject names from the list above. If only one subject applies, include only that one. Do not include any explanations or justifications.
-  ''')
 
 question_5_json_schema = [
   {
@@ -652,12 +984,12 @@ question_5_json_schema = [
   }
 ]
 
+_Q5_SCHEMA_STR = _dump_schema(question_5_json_schema)
+
 
 short_question_5_prompt = f'''For the following climate finance policy instrument, categorize the type of incentive established. If there are many incentives, list all of them.'''
 
-def get_question_5_prompt(instrument_summary, relevant_chunks, question_5_examples):
-    return f"""
-For the following climate finance policy instrument, categorize the type of incentive established. If there are many incentives, list all of them. Base your classification on the table provided below.
+_Q5_STATIC_PREFIX = f"""{_CLASSIFICATION_DIRECTIVES}For the following climate finance policy instrument, categorize the type of incentive established. If there are many incentives, list all of them. Base your classification on the table provided below.
 
 Keep in mind: When a government creates a new organization or imposes a new investment mandate or constraint on an existing one (e.g., a sovereign fund, public pension manager, or development bank) AND that entity implements one or several instruments, output two separate but linked classifications:
 
@@ -665,16 +997,7 @@ Keep in mind: When a government creates a new organization or imposes a new inve
 - Implementation layer – classify the tools that the entity will use to deliver on its mandate.  
 
 Here is the table to help you categorize: 
-{question_5_json_schema}
-
-Here is a summary of the climate finance policy instrument:
-{instrument_summary}
-
-And here are some relevant chunks from the climate finance policy instrument to help you categorize:
-{relevant_chunks}
-
-Finally, here are some examples of how this categorization has been done in the past:
-{question_5_examples}
+{_Q5_SCHEMA_STR}
 
 Please respond only with the categories and policy instruments in the provided table. Report your answers in the following JSON format:
 
@@ -688,6 +1011,22 @@ Please respond only with the categories and policy instruments in the provided t
 Do not include any explanations or justifications.
 """
 
+def get_question_5_prompt(instrument_summary, relevant_chunks, question_5_examples):
+    return build_prompt(5, instrument_summary, relevant_chunks, question_5_examples)
+
+def get_question_5_messages(instrument_summary, relevant_chunks, question_5_examples, cache_control=False):
+    return build_messages(5, instrument_summary, relevant_chunks, question_5_examples, cache_control=cache_control)
+
+def make_question_5_prompter(question_5_examples):
+    return make_prompter(5, question_5_examples)
+
+def get_question_5_prompts_batch(summaries, chunks, question_5_examples):
+    return build_prompts_batch(5, summaries, chunks, question_5_examples)
+
+def get_question_5_prompt_tokens(instrument_summary, relevant_chunks, question_5_examples):
+    return build_prompt_tokens(5, instrument_summary, relevant_chunks, question_5_examples)
+
+
 question_6_json_schema = {
   "type": "object",
   "properties": {
@@ -730,35 +1069,182 @@ question_6_json_schema = {
 }
 }
 
+_Q6_SCHEMA_STR = _dump_schema(question_6_json_schema)
+
 question_6_note = """The metadata details we care about are the date of announcement, entry into force, and end of the measure; the name of the authority who have adopted it; the type of authority responsible for adopting the measure (including national and subnational legislators, governments, regulatory agencies, enforcement agencies, and state-owned entities); and whether the focus of the policy is domestic or international."""
 
 short_question_6_prompt = f'''For each climate finance policy instrument that you have identified, report, if available: the date of announcement, entry into force, and end of the measure; the name of the authority who have adopted it; the type of authority responsible for adopting the measure (including national and subnational legislators, governments, regulatory agencies, enforcement agencies, and state-owned entities); and whether the focus of the policy is domestic or international.'''
 
+_Q6_STATIC_PREFIX = '''For each climate finance policy instrument that you have identified, report, if available: the date of announcement, entry into force, and end of the measure; the name of the authority who have adopted it; the type of authority responsible for adopting the measure (including national and subnational legislators, governments, regulatory agencies, enforcement agencies, and state-owned entities); and whether the focus of the policy is domestic or international.
+
+Provide your answer in the following json format:
+{
+  "announcement_date": "",
+  "entry_into_force_date": "",
+  "end_date": "",
+  "adopting_authority_name": "",
+  "adopting_authority_type": "",
+  "policy_geographical_focus": ""
+}
+
+If you do not know the answer, leave the field blank. Do not make up any information.
+'''
+
 def get_question_6_prompt(instrument_summary, relevant_chunks):
-  return(f'''For each climate finance policy instrument that you have identified, report, if available: the date of announcement, entry into force, and end of the measure; the name of the authority who have adopted it; the type of authority responsible for adopting the measure (including national and subnational legislators, governments, regulatory agencies, enforcement agencies, and state-owned entities); and whether the focus of the policy is domestic or international.
+  return build_prompt(6, instrument_summary, relevant_chunks)
+
+def get_question_6_messages(instrument_summary, relevant_chunks, cache_control=False):
+  return build_messages(6, instrument_summary, relevant_chunks, cache_control=cache_control)
+
+def get_question_6_prompts_batch(summaries, chunks):
+  return build_prompts_batch(6, summaries, chunks)
+
+def get_question_6_prompt_tokens(instrument_summary, relevant_chunks):
+  return build_prompt_tokens(6, instrument_summary, relevant_chunks)
+
+
+# Static prefix per question id. Adding a question means adding an entry here;
+# the get_question_N_* functions are thin wrappers over the builders below.
+_STATIC_PREFIXES = {
+    2: _Q2_STATIC_PREFIX,
+    3: _Q3_STATIC_PREFIX,
+    4: _Q4_STATIC_PREFIX,
+    5: _Q5_STATIC_PREFIX,
+    6: _Q6_STATIC_PREFIX,
+}
+
+
+def _static_prefix(question_id):
+    prefix = _STATIC_PREFIXES.get(question_id)
+    if prefix is None:
+        available = ", ".join(str(qid) for qid in _STATIC_PREFIXES)
+        raise KeyError(f"Unknown question_id {question_id!r}. Available ids: {available}")
+    return prefix
+
+
+def build_prompt(question_id, instrument_summary, relevant_chunks, examples=None):
+    """
+    Build the classification prompt for a question.
+
+    Args:
+        question_id: Question number (2-6)
+        instrument_summary: Summary of the policy instrument
+        relevant_chunks: Chunks retrieved for the instrument
+        examples: Examples of past categorizations (not used by question 6)
+
+    Returns:
+        Prompt string
+    """
+    return _render_prompt(_static_prefix(question_id), instrument_summary, relevant_chunks, examples)
+
+
+def build_messages(question_id, instrument_summary, relevant_chunks, examples=None, cache_control=False):
+    """Chat-message variant of build_prompt; see _classification_messages."""
+    return _classification_messages(
+        _static_prefix(question_id),
+        _render_dynamic_suffix(instrument_summary, relevant_chunks, examples),
+        cache_control,
+    )
+
+
+def make_prompter(question_id, examples=None):
+    """Return a (summary, chunks) -> prompt function with the examples baked in."""
+    return _make_prompter(_static_prefix(question_id), examples)
+
+
+def build_prompts_batch(question_id, summaries, chunks, examples=None):
+    """Build prompts for many instruments at once; see _prompts_batch."""
+    return _prompts_batch(_static_prefix(question_id), summaries, chunks, examples)
+
+
+def load_prompt_examples(path):
+    """
+    Load per-question examples from a deployment's JSON config file.
+
+    Args:
+        path: JSON file mapping question ids to their examples, e.g.
+            {"2": "...", "3": [...]}
+
+    Returns:
+        Dictionary mapping int question ids to examples
+    """
+    with open(path, encoding="utf-8") as f:
+        return {int(qid): examples for qid, examples in json.load(f).items()}
+
+
+def specialize_prompters(examples_by_question):
+    """
+    Specialize every question's prompt builder for a deployment's fixed examples.
+
+    Call once at service start; each returned function only joins the frozen
+    header with the per-instrument summary and chunks.
+
+    Args:
+        examples_by_question: Mapping of question id to examples, e.g. from
+            load_prompt_examples. Questions without an entry get no examples.
 
-  Here is a summary of the climate finance policy instrument:
-  {instrument_summary}
+    Returns:
+        Dictionary mapping question id to a (summary, chunks) -> prompt function
+    """
+    return {
+        question_id: make_prompter(question_id, examples_by_question.get(question_id))
+        for question_id in _STATIC_PREFIXES
+    }
+
+
+# Token ids of each static prefix, for self-hosted servers that accept
+# prompt_token_ids (e.g. vLLM TokensPrompt). With VECTORLAW_PRETOKENIZE=1 they
+# are computed at import; otherwise on first use of build_prompt_tokens.
+PRETOKENIZE = os.getenv("VECTORLAW_PRETOKENIZE", "0") == "1"
+_STATIC_PREFIX_TOKENS = {}
+
+
+def _get_encoding():
+    if not HAS_TIKTOKEN:
+        raise ImportError("tiktoken is required for pre-tokenized prompts. Install with: pip install tiktoken")
+    return tiktoken.get_encoding("cl100k_base")
 
-  And here are some relevant chunks from the climate finance policy instrument to help you categorize:
-  {relevant_chunks}
-  
-  Provide your answer in the following json format: 
-  {{
-    "announcement_date": "",
-    "entry_into_force_date": "",
-    "end_date": "",
-    "adopting_authority_name": "",
-    "adopting_authority_type": "",
-    "policy_geographical_focus": ""
-  }}
 
-  If you do not know the answer, leave the field blank. Do not make up any information.
-  ''') 
+def _static_prefix_tokens(question_id):
+    tokens = _STATIC_PREFIX_TOKENS.get(question_id)
+    if tokens is None:
+        tokens = tuple(_get_encoding().encode(_static_prefix(question_id)))
+        _STATIC_PREFIX_TOKENS[question_id] = tokens
+    return tokens
+
+
+def build_prompt_tokens(question_id, instrument_summary, relevant_chunks, examples=None):
+    """
+    Build a classification prompt as cl100k_base token ids.
+
+    The static prefix is tokenized once and reused; only the per-instrument
+    suffix is tokenized per call. Because the two halves are tokenized
+    separately, the ids can differ from encoding the full prompt at the seam,
+    but the prefix ids are identical across calls, which is what prefix
+    caching needs.
+
+    Args:
+        question_id: Question number (2-6)
+        instrument_summary: Summary of the policy instrument
+        relevant_chunks: Chunks retrieved for the instrument
+        examples: Examples of past categorizations (not used by question 6)
+
+    Returns:
+        List of token ids
+    """
+    tokens = list(_static_prefix_tokens(question_id))
+    tokens.extend(_get_encoding().encode(_render_dynamic_suffix(instrument_summary, relevant_chunks, examples)))
+    return tokens
+
+
+if PRETOKENIZE and HAS_TIKTOKEN:
+    for _question_id in _STATIC_PREFIXES:
+        _static_prefix_tokens(_question_id)
+    del _question_id
 
 
 def summarizing_prompt(document_text, focus_area, json_schema, note = None):
-    prompt = f"""
+    prompt = _SUMMARIZATION_DIRECTIVES + f"""
     Please summarize the following document with a particular focus on the {focus_area} of the document.
 
     Here is a json schema to help you understand what we mean by {focus_area}:
@@ -774,6 +1260,69 @@ def summarizing_prompt(document_text, focus_area, json_schema, note = None):
     return prompt
 
 
+_SUMMARY_DOCUMENT_HEADER = """Here is a climate finance policy document. The next message asks for a summary of it with a particular focus.
+
+"""
+
+
+def summarizing_question(focus_area, json_schema, note = None):
+    """
+    Build the document-independent part of a summarization prompt.
+
+    Used with get_document_prompt: the document is sent once as a shared
+    message before this question, so the long document prefix is identical
+    for every question and can be served from the provider's prompt cache.
+    """
+    prompt = _SUMMARIZATION_DIRECTIVES + f"""
+    Please summarize the document above with a particular focus on the {focus_area} of the document.
+
+    Here is a json schema to help you understand what we mean by {focus_area}:
+    {json_schema}
+    """
+    if note is not None:
+        prompt += f"\n    Keep this in mind when considering the json: {note}\n"
+    prompt += f"""
+    Remember, even though categorizations have been provided, you are not doing any categorization. You are just summarizing the document with a focus on its {focus_area}."""
+    return prompt
+
+
+def get_document_prompt(doc_text):
+    """
+    Returns the document message shared by all summary questions.
+    Optional for summarize.py; when provided together with get_summary_questions,
+    it is used instead of get_all_prompts.
+
+    Args:
+        doc_text: The document text to summarize
+
+    Returns:
+        Prompt string containing the document
+    """
+    return _SUMMARY_DOCUMENT_HEADER + doc_text
+
+
+@functools.lru_cache(maxsize=1)
+def _summary_questions():
+    return (
+        summarizing_question("sectoral focus", _Q2_SCHEMA_STR),
+        summarizing_question("subject of intervention", _Q3_SCHEMA_STR, question_3_note),
+        summarizing_question("market failure", _Q4_SCHEMA_STR),
+        summarizing_question("type of instrument", _Q5_SCHEMA_STR),
+        summarizing_question("metadata and logistical details", _Q6_SCHEMA_STR, question_6_note),
+    )
+
+
+def get_summary_questions():
+    """
+    Returns the summary questions (questions 2-6), without the document.
+    Optional for summarize.py; see get_document_prompt.
+
+    Returns:
+        List of prompt strings, one for each question/aspect to summarize
+    """
+    return list(_summary_questions())
+
+
 def get_all_prompts(doc_text):
     """
     Returns a list of prompts for summarization.
@@ -785,10 +1334,10 @@ def get_all_prompts(doc_text):
     Returns:
         List of prompt strings, one for each question/aspect to summarize
     """
-    question_2_prompt = summarizing_prompt(doc_text, "sectoral focus", question_2_json_schema)
-    question_3_prompt = summarizing_prompt(doc_text, "subject of intervention", question_3_json_schema, question_3_note)
-    question_4_prompt = summarizing_prompt(doc_text, "market failure", question_4_json_schema)
-    question_5_prompt = summarizing_prompt(doc_text, "type of instrument", question_5_json_schema)
-    question_6_prompt = summarizing_prompt(doc_text, "metadata and logistical details", question_6_json_schema, question_6_note)
+    question_2_prompt = summarizing_prompt(doc_text, "sectoral focus", _Q2_SCHEMA_STR)
+    question_3_prompt = summarizing_prompt(doc_text, "subject of intervention", _Q3_SCHEMA_STR, question_3_note)
+    question_4_prompt = summarizing_prompt(doc_text, "market failure", _Q4_SCHEMA_STR)
+    question_5_prompt = summarizing_prompt(doc_text, "type of instrument", _Q5_SCHEMA_STR)
+    question_6_prompt = summarizing_prompt(doc_text, "metadata and logistical details", _Q6_SCHEMA_STR, question_6_note)
     all_prompts = [question_2_prompt, question_3_prompt, question_4_prompt, question_5_prompt, question_6_prompt]
     return all_prompts
\ No newline at end of file
@@ -10,4 +10,6 @@ This package contains scripts for:
 - embed.py: Creating vector embeddings for RAG
 - summarize.py: Generating question-focused summaries
 - rag.py: RAG utilities for vector store queries
+- classification_cache.py: Semantic cache for classification responses
+- classify_batch.py: Concurrent classification requests for many instruments
 """
@@ -0,0 +1,151 @@
+"""
+Classification Response Cache
+
+This module provides a semantic cache for LLM classification answers. Many
+policy instruments across jurisdictions describe near-identical measures (green
+bond programmes, disclosure mandates, ...), so an answer for one instrument can
+be reused for another whose summary embedding is close enough, skipping the LLM
+call entirely.
+"""
+
+import copy
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+import numpy as np
+from openai import OpenAI
+
+try:
+    from .rag import embed_and_normalize
+except ImportError:
+    # Imported with utils/ itself on sys.path (as the scripts do)
+    from rag import embed_and_normalize
+
+try:
+    import faiss
+    HAS_FAISS = True
+except ImportError:
+    HAS_FAISS = False
+
+# Returned by ClassificationCache._lookup on a miss, so that a cached response
+# that is itself None still counts as a hit
+_MISS = object()
+
+
+class ClassificationCache:
+    """
+    Cache of classification responses keyed by (summary embedding, question_id).
+
+    A lookup hits when a previously classified summary for the same question has
+    an embedding whose cosine similarity with the new summary exceeds threshold.
+    Summaries are embedded through the same in-process and on-disk caches as RAG
+    queries. The threshold trades LLM calls for accuracy and should be calibrated
+    on a held-out set of instruments with known answers.
+    """
+
+    def __init__(
+        self,
+        client: OpenAI,
+        embedding_model: str = "text-embedding-3-large",
+        threshold: float = 0.92
+    ):
+        """
+        Args:
+            client: OpenAI client instance used to embed summaries
+            embedding_model: Model to use for summary embeddings
+            threshold: Minimum cosine similarity between summaries for a hit
+        """
+        self.client = client
+        self.embedding_model = embedding_model
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+        # Per question: FAISS index or growing float32 matrix, plus responses by row
+        self._indexes: Dict[Hashable, Any] = {}
+        self._matrices: Dict[Hashable, np.ndarray] = {}
+        self._responses: Dict[Hashable, List[Any]] = {}
+
+    def _embed(self, summary: str) -> np.ndarray:
+        return embed_and_normalize(self.client, self.embedding_model, summary)
+
+    def _best_match(self, question_id: Hashable, vector: np.ndarray) -> Optional[int]:
+        """Return the row of the most similar cached summary above threshold, if any."""
+        responses = self._responses.get(question_id)
+        if not responses:
+            return None
+        if HAS_FAISS:
+            scores, rows = self._indexes[question_id].search(vector[None, :], 1)
+            best_score, best_row = float(scores[0, 0]), int(rows[0, 0])
+        else:
+            sims = self._matrices[question_id][:len(responses)] @ vector
+            best_row = int(np.argmax(sims))
+            best_score = float(sims[best_row])
+        return best_row if best_score > self.threshold else None
+
+    def lookup(self, summary: str, question_id: Hashable) -> Optional[Any]:
+        """
+        Return the cached response for a near-duplicate summary, or None on a miss.
+
+        Args:
+            summary: Instrument summary
+            question_id: Question the response answers (e.g. 2 for sectoral focus)
+
+        Returns:
+            Copy of the cached response, or None
+        """
+        response = self._lookup(summary, question_id)
+        return None if response is _MISS else response
+
+    def _lookup(self, summary: str, question_id: Hashable) -> Any:
+        """Return a copy of the cached response for a near-duplicate summary, or _MISS."""
+        row = self._best_match(question_id, self._embed(summary))
+        if row is None:
+            self.misses += 1
+            return _MISS
+        self.hits += 1
+        return copy.deepcopy(self._responses[question_id][row])
+
+    def insert(self, summary: str, question_id: Hashable, response: Any) -> None:
+        """
+        Store the response for a summary.
+
+        Args:
+            summary: Instrument summary
+            question_id: Question the response answers
+            response: Parsed classification answer (e.g. the model's JSON as a dict)
+        """
+        vector = self._embed(summary)
+        responses = self._responses.setdefault(question_id, [])
+        if HAS_FAISS:
+            index = self._indexes.get(question_id)
+            if index is None:
+                index = self._indexes[question_id] = faiss.IndexFlatIP(vector.shape[0])
+            index.add(vector[None, :])
+        else:
+            matrix = self._matrices.get(question_id)
+            if matrix is None:
+                matrix = np.empty((64, vector.shape[0]), dtype=np.float32)
+            elif len(responses) == matrix.shape[0]:
+                # Double the capacity so appends stay amortized O(1)
+                matrix = np.concatenate([matrix, np.empty_like(matrix)])
+            matrix[len(responses)] = vector
+            self._matrices[question_id] = matrix
+        responses.append(copy.deepcopy(response))
+
+    def get_or_classify(self, summary: str, question_id: Hashable, classify: Callable[[], Any]) -> Any:
+        """
+        Return a cached response for the summary, calling classify() on a miss.
+
+        Args:
+            summary: Instrument summary
+            question_id: Question the response answers
+            classify: Zero-argument function that calls the LLM and returns the response
+
+        Returns:
+            Cached or freshly computed response
+        """
+        cached = self._lookup(summary, question_id)
+        if cached is not _MISS:
+            return cached
+        response = classify()
+        self.insert(summary, question_id, response)
+        return response
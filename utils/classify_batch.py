@@ -0,0 +1,75 @@
+"""
+Batch Classification Utilities
+
+This module sends classification prompts for many instruments concurrently.
+All prompts are built up front in one pass (sharing the static prefix of the
+prompts module), then sent with at most ``concurrency`` requests in flight, so
+wall-clock time is bounded by network round trips rather than their sum.
+"""
+
+import asyncio
+from types import ModuleType
+from typing import Any, Dict, List, Optional
+
+from openai import AsyncOpenAI
+
+
+async def _complete(
+    client: AsyncOpenAI,
+    semaphore: asyncio.Semaphore,
+    system_prompt: str,
+    prompt: str,
+    model: str
+) -> Optional[str]:
+    """Send one prompt once a concurrency slot is free; None on error."""
+    async with semaphore:
+        try:
+            response = await client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt}
+                ]
+            )
+        except Exception as e:
+            print(f"  ❌ Classification request failed: {e}")
+            return None
+    return response.choices[0].message.content
+
+
+async def classify_batch(
+    client: AsyncOpenAI,
+    prompts_module: ModuleType,
+    question_id: int,
+    instruments: List[Dict[str, Any]],
+    examples: Any = None,
+    concurrency: int = 32,
+    model: str = "gpt-4o-mini"
+) -> List[Optional[str]]:
+    """
+    Classify many instruments for one question with concurrent requests.
+
+    Args:
+        client: AsyncOpenAI client instance
+        prompts_module: Prompts module providing SYSTEM_PROMPT and
+            build_prompts_batch (e.g. analysis.prompts_example)
+        question_id: Question to classify for
+        instruments: List of dicts with 'summary' and 'chunks' keys
+        examples: Examples of past categorizations, shared by the batch
+        concurrency: Maximum number of requests in flight
+        model: Model to use for classification
+
+    Returns:
+        List of raw model responses aligned with instruments (None where a request failed)
+    """
+    prompts = prompts_module.build_prompts_batch(
+        question_id,
+        [instrument["summary"] for instrument in instruments],
+        [instrument["chunks"] for instrument in instruments],
+        examples
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(*(
+        _complete(client, semaphore, prompts_module.SYSTEM_PROMPT, prompt, model)
+        for prompt in prompts
+    ))
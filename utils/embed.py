@@ -9,14 +9,82 @@ them to a vector store for later retrieval.
 
 import os
 import re
+import hashlib
+import asyncio
 import argparse
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any
-import pickle
+from typing import Deque, Dict, Iterator, List, Any, Optional, Tuple
 
 import numpy as np
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import AsyncOpenAI
+
+from rag import HAS_PYARROW, PARQUET_SUFFIX, save_vector_store
+
+# The third-party `regex` engine is a drop-in for `re` that handles the lazy
+# [\s\S]+? footer patterns faster; RE2 is not an option because those
+# patterns rely on lookaheads, which RE2 does not support.
+try:
+    import regex as regex_engine
+    HAS_REGEX = True
+except ImportError:
+    regex_engine = re
+    HAS_REGEX = False
+
+# pyahocorasick matches all non-content keywords in one pass over a line
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+
+def _chunk_offsets_kernel(code_points: np.ndarray, chunk_size: int, step: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Character offsets of each chunk of a single-space-joined text.
+    
+    Finds the word boundaries and the overlapping windows in one pass; same
+    result as the NumPy path in chunk_text. JIT-compiled with Numba when available.
+    """
+    n = code_points.shape[0]
+    total_words = 1
+    for i in range(n):
+        if code_points[i] == 32:
+            total_words += 1
+    word_starts = np.empty(total_words, dtype=np.int64)
+    word_ends = np.empty(total_words, dtype=np.int64)
+    word_starts[0] = 0
+    w = 0
+    for i in range(n):
+        if code_points[i] == 32:
+            word_ends[w] = i
+            w += 1
+            word_starts[w] = i + 1
+    word_ends[w] = n
+
+    max_chunks = (total_words - 1) // step + 1
+    char_starts = np.empty(max_chunks, dtype=np.int64)
+    char_ends = np.empty(max_chunks, dtype=np.int64)
+    num_chunks = 0
+    for start in range(0, total_words, step):
+        end = min(start + chunk_size, total_words)
+        char_starts[num_chunks] = word_starts[start]
+        char_ends[num_chunks] = word_ends[end - 1]
+        num_chunks += 1
+        if start + chunk_size >= total_words:
+            break
+    return char_starts[:num_chunks], char_ends[:num_chunks]
+
+
+_chunk_offsets = njit(cache=True)(_chunk_offsets_kernel) if HAS_NUMBA else None
 
 
 def chunk_text(text: str, chunk_size: int = 200, chunk_overlap: int = 75) -> List[str]:
@@ -32,24 +100,127 @@ def chunk_text(text: str, chunk_size: int = 200, chunk_overlap: int = 75) -> Lis
         List of text chunks
     """
     words = text.split()
-    if not words:
+    if not words or chunk_size <= 0:
         return []
 
-    chunks: List[str] = []
-    start = 0
     total_words = len(words)
+    # Join once with single spaces; every chunk is then a single slice of this
+    # string (identical to " ".join(words[start:end])) instead of a fresh join
+    joined = " ".join(words)
+    # Word boundaries are the separator spaces, found in one vectorized pass
+    # over the code points (byte == code point for ASCII text; otherwise UTF-32,
+    # so indices always match Python str indices)
+    if joined.isascii():
+        code_points = np.frombuffer(joined.encode("ascii"), dtype=np.uint8)
+    else:
+        code_points = np.frombuffer(joined.encode("utf-32-le"), dtype=np.uint32)
+    if HAS_NUMBA:
+        char_starts, char_ends = _chunk_offsets(code_points, chunk_size, max(1, chunk_size - chunk_overlap))
+        return [
+            joined[char_start:char_end]
+            for char_start, char_end in zip(char_starts.tolist(), char_ends.tolist())
+        ]
+    spaces = np.flatnonzero(code_points == 32)
+    word_starts = np.concatenate(([0], spaces + 1))
+    word_ends = np.concatenate((spaces, [len(joined)]))
 
-    while start < total_words:
-        end = min(total_words, start + chunk_size)
-        chunk = " ".join(words[start:end]).strip()
-        if chunk:
-            chunks.append(chunk)
-        if end >= total_words:
-            break
-        # Decide new start: handle overlap
-        start += max(1, chunk_size - chunk_overlap)
+    # Window starts advance by chunk_size - chunk_overlap; stop after the first
+    # window that reaches the end of the document
+    starts = np.arange(0, total_words, max(1, chunk_size - chunk_overlap))
+    reaches_end = starts + chunk_size >= total_words
+    if reaches_end.any():
+        starts = starts[:int(np.argmax(reaches_end)) + 1]
+    ends = np.minimum(starts + chunk_size, total_words)
+
+    return [
+        joined[char_start:char_end]
+        for char_start, char_end in zip(word_starts[starts].tolist(), word_ends[ends - 1].tolist())
+    ]
+
+
+# Common boilerplate phrases likely indicating start/end of content
+HEAD_PATTERNS = [
+    r"^(?:.*Canada\.ca.*\n){1,5}",  # Canada.ca spam header
+    r"^Skip to main content[\n\r]+", 
+    r"^Skip to [^\n]+\n", 
+    r"^Language selection\n", 
+    r"^(?:Français|fr|Gouvernement du Canada)[\n/ ]+",
+    r"^Search[^\n]*\n", 
+    r"^Menu\n", 
+    r"^Main\n", 
+    r"^[\w \-/]+\nJobs and the workplace\n",  # menu bar spam
+    r"^(?:[\w ,/&-]+\n){3,10}You are here:[^\n]*\n",  # Common 'menu' preamble
+    r"^From:[^\n]+\n News release[\n]*",  # News release preamble
+]
+
+# Extended tail patterns to catch press/media contact and keyword megamenus
+TAIL_PATTERNS = [
+    r"\nReport a problem or mistake on this page.*$", 
+    r"\nDate modified:[^\n]*$", 
+    r"\n(?:Footer|End of Document|Contact us)[^\n]*$", 
+    r"\nThis page was last updated.*$",
+    r"\nFor media:[\s\S]+?(?=\n\S)",  # Stop at next headline, non-indented line
+    r"\nMedia Relations[\s\S]+?(?=\n\S|\Z)",
+    r"(?:\n[\w \-.,/:\(\)@]+){6,}[\s\n]*$",  # If 6+ consecutive lines of mostly names, contacts, orgs
+    r"\nSearch for related information by keyword:[\s\S]+?(?=\n\S|\Z)",
+    r"\nPage details[\s\S]+?(?=\n\S|\Z)",
+    r"\nAbout this site[\s\S]+?(?=\n\S|\Z)",
+    r"\nGovernment of Canada[\s\S]+?(?=\n\S|\Z)",
+    r"\nAll contacts[\s\S]+?(?=\n\S|\Z)",
+]
+
+# Compiled once at import. The per-pattern lists keep the original
+# first-match/sequential semantics; the unions are a single-scan pre-check
+# that lets documents with no boilerplate skip the per-pattern passes.
+_TRIM_FLAGS = regex_engine.IGNORECASE | regex_engine.MULTILINE
+HEAD_RES = tuple(regex_engine.compile(pat, _TRIM_FLAGS) for pat in HEAD_PATTERNS)
+TAIL_RES = tuple(regex_engine.compile(pat, _TRIM_FLAGS) for pat in TAIL_PATTERNS)
+HEAD_RE = regex_engine.compile("|".join(f"(?:{pat})" for pat in HEAD_PATTERNS), _TRIM_FLAGS)
+TAIL_RE = regex_engine.compile("|".join(f"(?:{pat})" for pat in TAIL_PATTERNS), _TRIM_FLAGS)
+
+
+# Lines at the top or bottom of a document containing any of these are dropped
+NON_CONTENT_KEYWORDS = [
+    "You are here:",
+    "Main Menu",
+    "Search Canada.ca",
+    "Back to top",
+    "Date modified:", 
+    "Report a problem or mistake on this page",
+    "Contact us",
+    "Page details",
+    "About this site",
+    "Government of Canada",
+    "All contacts",
+]
+NON_CONTENT_KEYWORDS_LOWER = tuple(k.lower() for k in NON_CONTENT_KEYWORDS)
 
-    return chunks
+if HAS_AHOCORASICK:
+    NON_CONTENT_AUTOMATON = ahocorasick.Automaton()
+    for keyword in NON_CONTENT_KEYWORDS_LOWER:
+        NON_CONTENT_AUTOMATON.add_word(keyword, keyword)
+    NON_CONTENT_AUTOMATON.make_automaton()
+
+
+def _is_non_content_line(line: str) -> bool:
+    """Check whether a line contains any NON_CONTENT_KEYWORDS (case-insensitive)."""
+    lowered = line.lower()
+    if HAS_AHOCORASICK:
+        return next(NON_CONTENT_AUTOMATON.iter(lowered), None) is not None
+    return any(k in lowered for k in NON_CONTENT_KEYWORDS_LOWER)
+
+
+def _trim_tail(cleaned: str) -> Tuple[str, bool]:
+    """Apply every tail pattern that removes more than a few characters."""
+    trimmed = False
+    if TAIL_RE.search(cleaned) is None:
+        return cleaned, trimmed
+    for pat in TAIL_RES:
+        cleaned_new, n = pat.subn('', cleaned)
+        if n and len(cleaned_new) < len(cleaned) - 8:
+            cleaned = cleaned_new
+            trimmed = True
+    return cleaned, trimmed
 
 
 def trim_non_content(text: str) -> str:
@@ -64,84 +235,62 @@ def trim_non_content(text: str) -> str:
     Returns:
         Cleaned text
     """
-    # Common boilerplate phrases likely indicating start/end of content
-    head_patterns = [
-        r"^(?:.*Canada\.ca.*\n){1,5}",  # Canada.ca spam header
-        r"^Skip to main content[\n\r]+", 
-        r"^Skip to [^\n]+\n", 
-        r"^Language selection\n", 
-        r"^(?:Français|fr|Gouvernement du Canada)[\n/ ]+",
-        r"^Search[^\n]*\n", 
-        r"^Menu\n", 
-        r"^Main\n", 
-        r"^[\w \-/]+\nJobs and the workplace\n",  # menu bar spam
-        r"^(?:[\w ,/&-]+\n){3,10}You are here:[^\n]*\n",  # Common 'menu' preamble
-        r"^From:[^\n]+\n News release[\n]*",  # News release preamble
-    ]
-
-    # Extended tail patterns to catch press/media contact and keyword megamenus
-    tail_patterns = [
-        r"\nReport a problem or mistake on this page.*$", 
-        r"\nDate modified:[^\n]*$", 
-        r"\n(?:Footer|End of Document|Contact us)[^\n]*$", 
-        r"\nThis page was last updated.*$",
-        r"\nFor media:[\s\S]+?(?=\n\S)",  # Stop at next headline, non-indented line
-        r"\nMedia Relations[\s\S]+?(?=\n\S|\Z)",
-        r"(?:\n[\w \-.,/:\(\)@]+){6,}[\s\n]*$",  # If 6+ consecutive lines of mostly names, contacts, orgs
-        r"\nSearch for related information by keyword:[\s\S]+?(?=\n\S|\Z)",
-        r"\nPage details[\s\S]+?(?=\n\S|\Z)",
-        r"\nAbout this site[\s\S]+?(?=\n\S|\Z)",
-        r"\nGovernment of Canada[\s\S]+?(?=\n\S|\Z)",
-        r"\nAll contacts[\s\S]+?(?=\n\S|\Z)",
-    ]
-
     cleaned = text.strip()
 
     # Heuristically trim head
-    for pat in head_patterns:
-        cleaned_new = re.sub(pat, '', cleaned, flags=re.IGNORECASE|re.MULTILINE)
-        if len(cleaned_new) < len(cleaned) - 8:  # Actually shortened content?
-            cleaned = cleaned_new
-            break
+    if HEAD_RE.search(cleaned) is not None:
+        for pat in HEAD_RES:
+            cleaned_new, n = pat.subn('', cleaned)
+            if n and len(cleaned_new) < len(cleaned) - 8:  # Actually shortened content?
+                cleaned = cleaned_new
+                break
 
     # Heuristically trim tail
-    trimmed = False
-    for pat in tail_patterns:
-        cleaned_new = re.sub(pat, '', cleaned, flags=re.IGNORECASE|re.MULTILINE)
-        if len(cleaned_new) < len(cleaned) - 8:
-            cleaned = cleaned_new
-            trimmed = True
+    cleaned, trimmed = _trim_tail(cleaned)
     # Try tail removal twice (to catch two-stage footers)
     if trimmed:
-        for pat in tail_patterns:
-            cleaned_new = re.sub(pat, '', cleaned, flags=re.IGNORECASE|re.MULTILINE)
-            if len(cleaned_new) < len(cleaned) - 8:
-                cleaned = cleaned_new
+        cleaned, _ = _trim_tail(cleaned)
 
     # Secondary: For repeated menu/footer junk, try to cut on keyword
-    NON_CONTENT_KEYWORDS = [
-        "You are here:",
-        "Main Menu",
-        "Search Canada.ca",
-        "Back to top",
-        "Date modified:", 
-        "Report a problem or mistake on this page",
-        "Contact us",
-        "Page details",
-        "About this site",
-        "Government of Canada",
-        "All contacts",
-    ]
     # Remove lines at top or bottom containing only these keywords
     lines = cleaned.splitlines()
+    start, end = 0, len(lines)
     # Remove leading non-content lines
-    while lines and any(k.lower() in lines[0].lower() for k in NON_CONTENT_KEYWORDS):
-        lines = lines[1:]
+    while start < end and _is_non_content_line(lines[start]):
+        start += 1
     # Remove trailing non-content lines
-    while lines and any(k.lower() in lines[-1].lower() for k in NON_CONTENT_KEYWORDS):
-        lines = lines[:-1]
+    while start < end and _is_non_content_line(lines[end - 1]):
+        end -= 1
 
-    return "\n".join(lines).strip()
+    return "\n".join(lines[start:end]).strip()
+
+
+def iter_documents(data_dir: Path, max_workers: int = 16) -> Iterator[Tuple[str, str]]:
+    """
+    Lazily read every .txt file in the input directory.
+    
+    Files are read by a thread pool (file reads release the GIL) with a bounded
+    read-ahead window, so many small files are read concurrently while only a
+    few texts are held in memory at a time.
+    
+    Args:
+        data_dir: Directory containing text files
+        max_workers: Number of reader threads
+    
+    Yields:
+        (document name without extension, text content) pairs in sorted order
+    """
+    paths = sorted(data_dir.glob("*.txt"))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending: Deque[Tuple[str, Future]] = deque()
+        for path in paths:
+            pending.append((path.stem, executor.submit(path.read_text, encoding="utf-8")))
+            if len(pending) >= 2 * max_workers:
+                name, future = pending.popleft()
+                yield name, future.result()
+        while pending:
+            name, future = pending.popleft()
+            yield name, future.result()
 
 
 def load_documents(data_dir: Path) -> Dict[str, str]:
@@ -154,31 +303,109 @@ def load_documents(data_dir: Path) -> Dict[str, str]:
     Returns:
         Dictionary mapping document names (without extension) to their text content
     """
-    documents: Dict[str, str] = {}
-    for path in sorted(data_dir.glob("*.txt")):
-        documents[path.stem] = path.read_text(encoding="utf-8")
-    return documents
+    return dict(iter_documents(data_dir))
+
+
+def dedupe_chunk_records(chunk_records: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+    """
+    Collapse chunk records with identical text so each text is embedded once.
+    
+    Texts are keyed by a 16-byte BLAKE2b digest rather than the text itself.
+    
+    Args:
+        chunk_records: List of chunk dictionaries with 'text' key
+    
+    Returns:
+        Tuple of (unique_records, inverse) where unique_records keeps the first
+        record for each distinct text and inverse[i] is the row of
+        chunk_records[i] in unique_records
+    """
+    unique: Dict[bytes, int] = {}
+    unique_records: List[Dict[str, Any]] = []
+    inverse = np.empty(len(chunk_records), dtype=np.intp)
+    for i, record in enumerate(chunk_records):
+        key = hashlib.blake2b(record["text"].encode("utf-8"), digest_size=16).digest()
+        row = unique.get(key)
+        if row is None:
+            row = unique[key] = len(unique_records)
+            unique_records.append(record)
+        inverse[i] = row
+    return unique_records, inverse
 
 
-def embed_chunk_batch(client: OpenAI, batch: List[Dict[str, Any]], embedding_model: str = "text-embedding-3-large") -> List[List[float]]:
+async def embed_chunk_batch(client: AsyncOpenAI, batch: List[Dict[str, Any]], embedding_model: str = "text-embedding-3-large") -> np.ndarray:
     """
     Generate embeddings for a batch of text chunks.
     
     Args:
-        client: OpenAI client instance
+        client: AsyncOpenAI client instance
         batch: List of chunk dictionaries with 'text' key
         embedding_model: Model to use for embeddings
     
     Returns:
-        List of embedding vectors
+        Float32 matrix with one embedding row per chunk
     """
     inputs = [item["text"] for item in batch]
-    response = client.embeddings.create(
+    response = await client.embeddings.create(
         model=embedding_model,
         input=inputs
     )
-    # OpenAI returns embeddings in the same order as inputs
-    return [item.embedding for item in response.data]
+    # OpenAI returns embeddings in the same order as inputs; convert them to
+    # float32 once here so callers never handle per-float Python objects
+    return np.asarray([item.embedding for item in response.data], dtype=np.float32)
+
+
+async def embed_chunk_records(
+    client: AsyncOpenAI,
+    chunk_records: List[Dict[str, Any]],
+    batch_size: int = 64,
+    embedding_model: str = "text-embedding-3-large",
+    concurrency: int = 8,
+    scratch_path: Optional[Path] = None
+) -> np.ndarray:
+    """
+    Embed all chunk records, keeping up to `concurrency` batch requests in flight.
+    
+    Each batch is written into its rows of a single (N, D) float32 matrix as soon
+    as it arrives, so no per-chunk Python lists of floats are kept around.
+    
+    Args:
+        client: AsyncOpenAI client instance
+        chunk_records: List of chunk dictionaries with 'text' key
+        batch_size: Number of chunks per embedding request
+        embedding_model: Model to use for embeddings
+        concurrency: Maximum number of concurrent requests
+        scratch_path: If given, back the matrix with an np.memmap file at this
+                      path instead of RAM (the caller removes it when done)
+    
+    Returns:
+        Float32 matrix with one embedding row per chunk record, in record order
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    done = 0
+    matrix: Optional[np.ndarray] = None
+    
+    async def run_batch(start: int) -> None:
+        nonlocal done, matrix
+        batch = chunk_records[start:start + batch_size]
+        async with semaphore:
+            embeddings = await embed_chunk_batch(client, batch, embedding_model)
+        if matrix is None:
+            # The embedding dimension is only known once the first batch returns
+            shape = (len(chunk_records), embeddings.shape[1])
+            if scratch_path is not None:
+                matrix = np.memmap(scratch_path, dtype=np.float32, mode="w+", shape=shape)
+            else:
+                matrix = np.empty(shape, dtype=np.float32)
+        matrix[start:start + len(batch)] = embeddings
+        done += len(batch)
+        print(f"Embedded {done} / {len(chunk_records)} chunks", end="\r")
+    
+    await asyncio.gather(*(
+        run_batch(start)
+        for start in range(0, len(chunk_records), batch_size)
+    ))
+    return matrix
 
 
 def main():
@@ -202,7 +429,7 @@ Examples:
     parser.add_argument(
         "--output",
         required=True,
-        help="Output path for vector store pickle file"
+        help="Output path for vector store pickle file (use a .parquet suffix for a Parquet table; requires pyarrow)"
     )
     parser.add_argument(
         "--chunk-size",
@@ -227,6 +454,17 @@ Examples:
         default=64,
         help="Batch size for embedding generation (default: 64)"
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Maximum number of embedding requests in flight (default: 8)"
+    )
+    parser.add_argument(
+        "--quantize",
+        action="store_true",
+        help="Store embeddings as int8 with per-row scales, a quarter of the float32 size"
+    )
     parser.add_argument(
         "--no-trim-content",
         action="store_true",
@@ -248,31 +486,30 @@ Examples:
     
     if not input_dir.exists():
         raise FileNotFoundError(f"Input directory not found: {input_dir}")
+    # Fail before paying for embeddings rather than at save time
+    if output_path.suffix == PARQUET_SUFFIX and not HAS_PYARROW:
+        raise ImportError("pyarrow is required for a .parquet output. Install it with: pip install pyarrow")
     
     # Initialize OpenAI client
-    client = OpenAI(
+    client = AsyncOpenAI(
         api_key=OPENROUTER_API_KEY,
         base_url="https://openrouter.ai/api/v1"
     )
     
-    # Load documents
+    # Stream documents through trimming and chunking one at a time, so only the
+    # chunks (not the raw and trimmed corpus) are held in memory
     print(f"Loading documents from: {input_dir}")
-    documents = load_documents(input_dir)
-    print(f"Loaded {len(documents)} documents")
-    
-    # Trim content (default behavior, matching original notebook)
     if not args.no_trim_content:
+        # Trim content (default behavior, matching original notebook)
         print("Trimming boilerplate content...")
-        for doc_name in documents:
-            documents[doc_name] = trim_non_content(documents[doc_name])
-    
-    # Chunk documents
     print(f"Chunking documents (size={args.chunk_size}, overlap={args.chunk_overlap})...")
     chunk_records: List[Dict[str, Any]] = []
-    for doc_name, text in documents.items():
+    num_documents = 0
+    for doc_name, text in iter_documents(input_dir):
+        num_documents += 1
+        if not args.no_trim_content:
+            text = trim_non_content(text)
         chunks = chunk_text(text, chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
-        if not chunks:
-            continue
         for idx, chunk in enumerate(chunks):
             chunk_records.append(
                 {
@@ -281,6 +518,7 @@ Examples:
                     "text": chunk,
                 }
             )
+    print(f"Loaded {num_documents} documents")
     
     print(f"Prepared {len(chunk_records)} chunks across all documents")
     
@@ -288,46 +526,63 @@ Examples:
         print("No chunks were prepared; vector store was not created.")
         return
     
-    # Generate embeddings
-    print(f"Generating embeddings (batch size: {args.batch_size})...")
-    enriched_records: List[Dict[str, Any]] = []
-    for start in range(0, len(chunk_records), args.batch_size):
-        batch = chunk_records[start:start + args.batch_size]
-        embeddings = embed_chunk_batch(client, batch, args.embedding_model)
-        for record, embedding in zip(batch, embeddings):
-            enriched = {**record, "embedding": embedding}
-            enriched_records.append(enriched)
-        print(f"Embedded {len(enriched_records)} / {len(chunk_records)} chunks", end="\r")
-    
-    print()  # New line after progress
-    
-    # Organize per-document and persist
-    print("Organizing vector store...")
-    vector_store: Dict[str, Dict[str, Any]] = {}
-    for record in enriched_records:
-        doc_entry = vector_store.setdefault(
-            record["doc_name"],
-            {"embeddings": [], "chunks": []}
-        )
-        doc_entry["embeddings"].append(record["embedding"])
-        doc_entry["chunks"].append(
-            {
-                "chunk_index": record["chunk_index"],
-                "text": record["text"],
-            }
-        )
+    # Leftover boilerplate repeats across documents; embed each distinct text once
+    unique_records, inverse = dedupe_chunk_records(chunk_records)
+    if len(unique_records) < len(chunk_records):
+        print(f"Embedding {len(unique_records)} unique chunks ({len(chunk_records) - len(unique_records)} duplicates skipped)")
     
-    # Convert embeddings to numpy arrays
-    for doc_name, doc_entry in vector_store.items():
-        doc_entry["embeddings"] = np.array(doc_entry["embeddings"], dtype=np.float32)
-    
-    # Save vector store
-    with open(output_path, "wb") as f:
-        pickle.dump(vector_store, f)
+    # Generate embeddings
+    print(f"Generating embeddings (batch size: {args.batch_size}, concurrency: {args.concurrency})...")
+    # Embeddings are streamed into a memory-mapped scratch file next to the
+    # output, so the full (N, D) matrix never has to fit in RAM at once
+    scratch_path = output_path.with_name(output_path.name + ".embeddings.f32")
+    # The scratch file is removed even if embedding fails or is interrupted
+    try:
+        embeddings = asyncio.run(embed_chunk_records(
+            client,
+            unique_records,
+            batch_size=args.batch_size,
+            embedding_model=args.embedding_model,
+            concurrency=args.concurrency,
+            scratch_path=scratch_path
+        ))
+        
+        print()  # New line after progress
+        
+        # Organize per-document and persist. Records are grouped by document, so unless
+        # duplicates were collapsed each document's embeddings are a contiguous row
+        # range of the matrix (a view, not a copy)
+        print("Organizing vector store...")
+        vector_store: Dict[str, Dict[str, Any]] = {}
+        for record in chunk_records:
+            doc_entry = vector_store.setdefault(record["doc_name"], {"chunks": []})
+            doc_entry["chunks"].append(
+                {
+                    "chunk_index": record["chunk_index"],
+                    "text": record["text"],
+                }
+            )
+        row = 0
+        for doc_entry in vector_store.values():
+            num_chunks = len(doc_entry["chunks"])
+            if len(unique_records) == len(chunk_records):
+                doc_entry["embeddings"] = np.asarray(embeddings[row:row + num_chunks])
+            else:
+                # Fan the unique embeddings back out to every duplicate chunk
+                doc_entry["embeddings"] = np.asarray(embeddings[inverse[row:row + num_chunks]])
+            row += num_chunks
+        num_stored = len(vector_store)
+        
+        # Save vector store; the embedding rows are copied straight from the scratch file
+        save_vector_store(vector_store, output_path, quantize=args.quantize)
+    finally:
+        # Drop the views of the memmap before removing its backing file
+        vector_store = embeddings = None
+        scratch_path.unlink(missing_ok=True)
     
     print(f"✅ Persisted vector store to {output_path}")
-    print(f"   - Documents: {len(vector_store)}")
-    print(f"   - Total chunks: {len(enriched_records)}")
+    print(f"   - Documents: {num_stored}")
+    print(f"   - Total chunks: {len(chunk_records)}")
 
 
 if __name__ == "__main__":
@@ -17,12 +17,14 @@ The script will automatically discover:
 - Distribution statistics for each category
 """
 
+import re
 import pandas as pd
 import numpy as np
 import argparse
-from pathlib import Path
-from typing import List, Optional, Dict
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
 
 
 def print_section(title: str, char: str = "="):
@@ -73,7 +75,7 @@ def discover_document_types(df: pd.DataFrame, doc_type_column: str = 'Document T
     return df[doc_type_column].value_counts()
 
 
-def discover_instruments(df: pd.DataFrame, instrument_column: str = 'Instrument') -> Dict[str, int]:
+def discover_instruments(df: pd.DataFrame, instrument_column: str = 'Instrument') -> Counter:
     """
     Discover all unique instruments in the dataset.
     Instruments may be semicolon-separated in a single cell.
@@ -83,22 +85,26 @@ def discover_instruments(df: pd.DataFrame, instrument_column: str = 'Instrument'
         instrument_column: Name of the instrument column
     
     Returns:
-        Dictionary mapping instrument to count of documents containing it
+        Counter mapping instrument to count of documents containing it, in
+        first-seen order; use most_common(n) for the top instruments
     """
     if instrument_column not in df.columns:
-        return {}
-    
-    all_instruments = []
-    
-    for value in df[instrument_column].dropna():
-        if pd.notna(value):
-            # Split by semicolon and clean
-            instruments = [item.strip() for item in str(value).split(';') if item.strip()]
-            all_instruments.extend(instruments)
-    
-    # Count occurrences
-    instrument_counts = Counter(all_instruments)
-    return dict(sorted(instrument_counts.items(), key=lambda x: x[1], reverse=True))
+        return Counter()
+    
+    # Instrument cells repeat heavily, so count distinct cells first and only
+    # split/strip those with pandas' vectorized string methods, carrying the
+    # cell counts along as weights
+    cell_counts = df[instrument_column].dropna().astype(str).value_counts(sort=False)
+    pieces = pd.DataFrame({
+        'instrument': cell_counts.index.str.split(';'),
+        'count': cell_counts.to_numpy(),
+    }).explode('instrument')
+    pieces['instrument'] = pieces['instrument'].str.strip()
+    pieces = pieces[pieces['instrument'] != '']
+    
+    # Counts come out in first-seen order, so most_common() (a heap selection,
+    # stable among ties) ranks them as a full sort would without sorting them all
+    return Counter(pieces.groupby('instrument', sort=False)['count'].sum().to_dict())
 
 
 def filter_by_instruments(
@@ -115,15 +121,20 @@ def filter_by_instruments(
         instrument_column: Name of the instrument column
     
     Returns:
-        Filtered DataFrame
+        Filtered DataFrame (df itself if the column is missing; copy before mutating)
     """
     if instrument_column not in df.columns:
-        return df.copy()
+        return df
     
-    mask = df[instrument_column].apply(
-        lambda x: any(instr in str(x) for instr in instruments) if pd.notna(x) else False
-    )
-    return df[mask].copy()
+    if not instruments:
+        return df.iloc[:0]
+    
+    # One regex alternation of the literal instrument strings scans each cell
+    # once, instead of one Python substring test per (row, instrument) pair
+    pattern = '|'.join(map(re.escape, instruments))
+    values = df[instrument_column]
+    mask = values.notna() & values.astype(str).str.contains(pattern, regex=True, na=False)
+    return df[mask]
 
 
 def filter_by_document_types(
@@ -140,15 +151,15 @@ def filter_by_document_types(
         doc_type_column: Name of the document type column
     
     Returns:
-        Filtered DataFrame
+        Filtered DataFrame (df itself if the column is missing; copy before mutating)
     """
     if doc_type_column not in df.columns:
-        return df.copy()
+        return df
     
     mask = ~df[doc_type_column].str.strip().str.casefold().isin(
         [x.casefold() for x in excluded_types]
     )
-    return df[mask].copy()
+    return df[mask]
 
 
 def filter_by_geography(
@@ -165,12 +176,12 @@ def filter_by_geography(
         geography_column: Name of the geography column
     
     Returns:
-        Filtered DataFrame
+        Filtered DataFrame (df itself if the column is missing; copy before mutating)
     """
     if geography_column not in df.columns:
-        return df.copy()
+        return df
     
-    return df[df[geography_column] == geography].copy()
+    return df[df[geography_column] == geography]
 
 
 def explore_dataset(
@@ -201,7 +212,19 @@ def explore_dataset(
     """
     # Load data
     print_section("Loading Dataset")
+    # C engine: text cells may contain quoted newlines, which pandas' pyarrow
+    # engine cannot parse
     df = pd.read_csv(input_path)
+    # Geography and document type have few distinct values; grouping by
+    # categorical copies of them works on small integer codes. The frames
+    # themselves (and those returned) keep the columns' original dtypes
+    group_keys = {
+        col: df[col].astype("category")
+        for col in (geography_column, doc_type_column)
+        if col in df.columns
+    }
+    geography_key = group_keys.get(geography_column, geography_column)
+    doc_type_key = group_keys.get(doc_type_column, doc_type_column)
     print(f"✅ Loaded {len(df):,} documents from {input_path}")
     print(f"   Total columns: {len(df.columns)}")
     
@@ -219,8 +242,10 @@ def explore_dataset(
     geographies = discover_geographies(df, geography_column)
     if geographies:
         print(f"✅ Found {len(geographies)} unique geographies:")
+        # One counting pass instead of one equality scan per geography
+        geography_sizes = df.groupby(geography_key, sort=False, observed=True).size()
         for geo in geographies:
-            count = (df[geography_column] == geo).sum()
+            count = geography_sizes.get(geo, 0)
             print(f"   {geo:30} {count:>6} documents")
     else:
         print("⚠️  No geographies found (column may be missing or empty)")
@@ -242,15 +267,16 @@ def explore_dataset(
     instrument_counts = discover_instruments(df, instrument_column)
     if instrument_counts:
         print(f"✅ Found {len(instrument_counts)} unique instruments:")
-        for instr, count in list(instrument_counts.items())[:30]:
+        for instr, count in instrument_counts.most_common(30):
             print(f"   {instr:50} {count:>6}")
         if len(instrument_counts) > 30:
             print(f"   ... and {len(instrument_counts) - 30} more instruments")
     else:
         print("⚠️  No instruments found (column may be missing or empty)")
     
-    # Apply filters if specified
-    working_df = df.copy()
+    # Apply filters if specified. The filters return new frames, so df is never
+    # modified and no defensive copy is needed
+    working_df = df
     original_count = len(working_df)
     
     # Filter by instruments if specified
@@ -266,8 +292,9 @@ def explore_dataset(
     if exclude_doc_types:
         print_section("Filtering by Document Type")
         print(f"Excluding {len(exclude_doc_types)} document types:")
+        doc_type_sizes = working_df.groupby(doc_type_key, sort=False, observed=True).size()
         for doc_type in exclude_doc_types:
-            count = (working_df[doc_type_column] == doc_type).sum()
+            count = doc_type_sizes.get(doc_type, 0)
             if count > 0:
                 print(f"   - {doc_type} ({count} documents)")
         
@@ -283,8 +310,16 @@ def explore_dataset(
     geography_dataframes = {}
     geography_counts = {}
     
+    # Split by geography in a single groupby pass rather than one full-column
+    # scan per geography
+    if geography_column in working_df.columns:
+        geography_rows = working_df.groupby(geography_key, sort=False, observed=True).indices
+    
     for geo in filter_geographies:
-        geo_df = filter_by_geography(working_df, geo, geography_column)
+        if geography_column in working_df.columns:
+            geo_df = working_df.take(geography_rows.get(geo, np.empty(0, dtype=np.intp)))
+        else:
+            geo_df = filter_by_geography(working_df, geo, geography_column)
         count = len(geo_df)
         geography_dataframes[geo] = geo_df
         geography_counts[geo] = count
@@ -294,15 +329,16 @@ def explore_dataset(
         print_section("Document Type and Instrument Relationships")
         print("Top instruments by document type:")
         
-        # Get top document types
-        top_doc_types = working_df[doc_type_column].value_counts().head(10)
+        # Get top document types (select the top 10 rather than sorting every count)
+        top_doc_types = working_df[doc_type_column].value_counts(sort=False).nlargest(10)
+        doc_type_rows = working_df.groupby(doc_type_key, sort=False, observed=True).indices
         
         for doc_type in top_doc_types.index:
-            doc_type_df = working_df[working_df[doc_type_column] == doc_type]
+            doc_type_df = working_df.take(doc_type_rows.get(doc_type, np.empty(0, dtype=np.intp)))
             if len(doc_type_df) > 0:
                 doc_type_instruments = discover_instruments(doc_type_df, instrument_column)
                 print(f"\n   {doc_type} ({len(doc_type_df)} documents):")
-                for instr, count in list(doc_type_instruments.items())[:3]:
+                for instr, count in doc_type_instruments.most_common(3):
                     pct = (count / len(doc_type_df) * 100) if len(doc_type_df) > 0 else 0
                     print(f"      {instr:50} {count:>4} ({pct:>5.1f}%)")
     
@@ -316,7 +352,7 @@ def explore_dataset(
             if len(geo_df) > 0:
                 geo_instruments = discover_instruments(geo_df, instrument_column)
                 print(f"\n   {geo}:")
-                for instr, count in list(geo_instruments.items())[:5]:
+                for instr, count in geo_instruments.most_common(5):
                     pct = (count / len(geo_df) * 100) if len(geo_df) > 0 else 0
                     print(f"      {instr:50} {count:>4} ({pct:>5.1f}%)")
     
@@ -326,12 +362,18 @@ def explore_dataset(
         output_path.mkdir(parents=True, exist_ok=True)
         
         print_section("Saving Filtered Datasets")
-        for geo, geo_df in geography_dataframes.items():
-            if len(geo_df) > 0:
-                # Create safe filename
-                safe_name = str(geo).lower().replace(' ', '_').replace('/', '_')
-                output_file = output_path / f"{safe_name}_df.csv"
-                geo_df.to_csv(output_file, index=False)
+        # Writes are largely I/O-bound, so run them in a thread pool and report
+        # in the original order as they finish
+        with ThreadPoolExecutor() as executor:
+            pending = []
+            for geo, geo_df in geography_dataframes.items():
+                if len(geo_df) > 0:
+                    # Create safe filename
+                    safe_name = str(geo).lower().replace(' ', '_').replace('/', '_')
+                    output_file = output_path / f"{safe_name}_df.csv"
+                    pending.append((geo, geo_df, output_file, executor.submit(geo_df.to_csv, output_file, index=False)))
+            for geo, geo_df, output_file, future in pending:
+                future.result()
                 print(f"  ✅ Saved {geo}: {output_file} ({len(geo_df)} documents)")
     
     return {
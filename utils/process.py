@@ -7,36 +7,103 @@ resume from partial progress if interrupted. Supports language detection, transl
 and filtering operations.
 """
 
+import hashlib
+import json
+import shutil
 import pandas as pd
 import argparse
+from collections import Counter
 from pathlib import Path
 from tqdm import tqdm
 
 from translate import process_text
 
+# pyarrow is needed for Parquet output
+try:
+    import pyarrow  # noqa: F401 (only probed; pandas writes the Parquet files)
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+PARQUET_SUFFIX = ".parquet"
+
+
+def _json_scalar(value):
+    """Convert NumPy scalars (e.g. int64 ids) to plain Python values for json.dumps."""
+    return value.item() if hasattr(value, 'item') else value
+
+
+def read_results(path: Path) -> pd.DataFrame:
+    """Read a results/checkpoint file written by write_results (CSV, or Parquet by suffix)."""
+    if Path(path).suffix == PARQUET_SUFFIX:
+        return pd.read_parquet(path)
+    return pd.read_csv(path, escapechar='\\')
+
+
+def write_results(df: pd.DataFrame, path: Path) -> None:
+    """
+    Write results as CSV, or as Parquet if path has a .parquet suffix.
+    
+    Parquet stores the text columns as-is (no quoting or escaping) and is
+    much smaller for repetitive legal text.
+    """
+    if Path(path).suffix == PARQUET_SUFFIX:
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False, escapechar='\\')
+
+
+def _load_checkpoint_log(log_path: Path) -> dict:
+    """
+    Read the per-row checkpoint log written by process_dataframe_with_checkpoints.
+    
+    Returns:
+        Dictionary mapping row id to (processed, detected_language); a truncated
+        last line (from an interrupted write) is ignored
+    """
+    results = {}
+    with open(log_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            results[record['id']] = (record['processed'], record['detected_language'])
+    return results
+
 
 def process_dataframe_with_checkpoints(
     df: pd.DataFrame,
     save_path: str,
     mode: str = 'auto',
     text_column: str = 'text',
-    id_column: str = 'file'
+    id_column: str = 'file',
+    checkpoint_every: int = 50
 ) -> pd.DataFrame:
     """
     Process dataframe with automatic checkpoint saving.
     Supports resuming from partial progress.
     
+    Each processed row is appended to a JSON-lines log next to the checkpoint
+    (``save_path + '.jsonl'``), and the full CSV is only rewritten every
+    ``checkpoint_every`` rows, so checkpointing costs O(rows) rather than
+    rewriting the whole DataFrame after every row.
+    
     Args:
         df: DataFrame with text data
-        save_path: Path to save checkpoint CSV
+        save_path: Path to save checkpoint CSV (or Parquet, with a .parquet suffix)
         mode: Processing mode - 'auto', 'translate', 'filter', or 'detect_only'
         text_column: Name of the column containing text to process
         id_column: Name of the column to use for identifying rows (for checkpointing)
+        checkpoint_every: Rewrite the checkpoint CSV after this many processed rows
     
     Returns:
         Processed DataFrame
     """
-    working_df = df.copy()
+    # A shallow copy: the input's (possibly very large) text column is shared,
+    # not duplicated. processed/detected_language are always (re)assigned as
+    # whole new columns below before any in-place write, so df is never modified.
+    working_df = df.copy(deep=False)
     
     # Ensure required columns exist
     if text_column not in working_df.columns:
@@ -51,7 +118,7 @@ def process_dataframe_with_checkpoints(
     checkpoint_path = Path(save_path)
     if checkpoint_path.exists():
         try:
-            checkpoint_df = pd.read_csv(checkpoint_path, escapechar='\\')
+            checkpoint_df = read_results(checkpoint_path)
             print(f"Loaded checkpoint from {save_path}")
             
             # Merge processed results from checkpoint
@@ -77,47 +144,156 @@ def process_dataframe_with_checkpoints(
         working_df['processed'] = None
         working_df['detected_language'] = None
     
-    # Process each row
+    # Results are assigned as Python objects (str or None) whatever dtype the checkpoint had
+    working_df['processed'] = working_df['processed'].astype(object)
+    working_df['detected_language'] = working_df['detected_language'].astype(object)
+    
+    # Replay rows processed after the last CSV checkpoint
+    log_path = Path(f"{save_path}.jsonl")
+    if log_path.exists():
+        logged = _load_checkpoint_log(log_path)
+        if logged:
+            print(f"Loaded {len(logged)} processed rows from {log_path}")
+            in_log = working_df[id_column].isin(list(logged))
+            logged_ids = working_df.loc[in_log, id_column]
+            working_df.loc[in_log, 'processed'] = logged_ids.map({k: v[0] for k, v in logged.items()})
+            working_df.loc[in_log, 'detected_language'] = logged_ids.map({k: v[1] for k, v in logged.items()})
+    
+    # Only rows without a (non-empty) processed result need work
+    existing = working_df['processed']
+    todo = ~(existing.notna() & (existing.astype(str).str.len() > 0))
+    records = working_df.loc[todo, [id_column, text_column]].to_dict('records')
+    todo_index = working_df.index[todo]
+    
     total_rows = len(working_df)
     processed_count = 0
-    skipped_count = 0
+    skipped_count = total_rows - len(records)
     error_count = 0
+    reused_count = 0
     
-    for idx, row in tqdm(working_df.iterrows(), total=total_rows, desc="Processing"):
-        text = row[text_column]
-        existing_processed = row.get('processed') if pd.notna(row.get('processed')) else None
-        
-        # Skip if already processed
-        if existing_processed and len(str(existing_processed)) > 0:
-            skipped_count += 1
-            continue
-        
-        # Process the text
-        try:
-            processed, detected_lang = process_text(text, mode=mode)
-            working_df.at[idx, 'processed'] = processed
-            working_df.at[idx, 'detected_language'] = detected_lang
-            processed_count += 1
-        except Exception as e:
-            error_count += 1
-            row_id = row.get(id_column, idx)
-            print(f"\n⚠️  Error processing {row_id}: {e}")
-            working_df.at[idx, 'processed'] = None
-            working_df.at[idx, 'detected_language'] = None
-        
-        # Save checkpoint after each row
-        working_df.to_csv(save_path, index=False, escapechar='\\')
+    # Identical texts (common across jurisdictions) are processed once and later
+    # rows reuse the result; texts are keyed by a 16-byte BLAKE2b digest
+    results_by_text = {}
+    
+    # Results are collected and written back to working_df in one assignment per
+    # checkpoint, instead of a scalar .at[] write per row
+    pending_index = []
+    pending_processed = []
+    pending_languages = []
+    
+    def apply_pending():
+        if pending_index:
+            working_df.loc[pending_index, 'processed'] = pd.Series(pending_processed, index=pending_index, dtype=object)
+            working_df.loc[pending_index, 'detected_language'] = pd.Series(pending_languages, index=pending_index, dtype=object)
+            pending_index.clear()
+            pending_processed.clear()
+            pending_languages.clear()
+    
+    # Process each remaining row
+    with open(log_path, 'a', encoding='utf-8') as log_file:
+        for idx, record in tqdm(zip(todo_index, records), total=len(records), desc="Processing"):
+            row_id = record[id_column]
+            text = record[text_column]
+            key = hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest() if isinstance(text, str) else None
+            try:
+                if key is not None and key in results_by_text:
+                    processed, detected_lang = results_by_text[key]
+                    reused_count += 1
+                else:
+                    processed, detected_lang = process_text(text, mode=mode)
+                    if key is not None:
+                        results_by_text[key] = (processed, detected_lang)
+                processed_count += 1
+                log_file.write(json.dumps({
+                    'id': _json_scalar(row_id),
+                    'processed': processed,
+                    'detected_language': detected_lang,
+                }) + "\n")
+                log_file.flush()
+            except Exception as e:
+                error_count += 1
+                print(f"\n⚠️  Error processing {row_id}: {e}")
+                processed, detected_lang = None, None
+            pending_index.append(idx)
+            pending_processed.append(processed)
+            pending_languages.append(detected_lang)
+            
+            # Rewrite the full checkpoint periodically; the log covers the rows in between
+            if (processed_count + error_count) % checkpoint_every == 0:
+                apply_pending()
+                write_results(working_df, save_path)
+    apply_pending()
+    
+    # The CSV now holds every result, so the log is no longer needed
+    write_results(working_df, save_path)
+    log_path.unlink()
     
     # Print summary
     print(f"\n✅ Processing complete!")
     print(f"   - Processed: {processed_count}")
     print(f"   - Skipped (already done): {skipped_count}")
+    if reused_count:
+        print(f"   - Reused (duplicate text): {reused_count}")
     print(f"   - Errors: {error_count}")
     print(f"   - Total: {total_rows}")
     
     return working_df
 
 
+def _update_statistics(stats: dict, df: pd.DataFrame) -> None:
+    """Add the language counts and processing statistics of a processed DataFrame to stats."""
+    stats['languages'].update(df['detected_language'].dropna().tolist())
+    processed = df['processed']
+    stats['successful'] += int(processed.notna().sum())
+    stats['failed'] += int(processed.isna().sum())
+    stats['total_length'] += int(processed.dropna().str.len().sum())
+
+
+def process_csv_in_chunks(
+    input_path: Path,
+    output_path: Path,
+    chunksize: int,
+    **process_kwargs
+) -> dict:
+    """
+    Process a CSV that is too large to hold in memory, chunksize rows at a time.
+    
+    Each chunk is processed with process_dataframe_with_checkpoints using its
+    own checkpoint (``OUTPUT.partN.csv``), so an interrupted run resumes from
+    the chunk it stopped in. Once every chunk is done, the parts are
+    concatenated into output_path and removed.
+    
+    Args:
+        input_path: Input CSV file path
+        output_path: Output CSV file path
+        chunksize: Number of rows read and processed at a time
+        **process_kwargs: Passed on to process_dataframe_with_checkpoints
+    
+    Returns:
+        Dictionary of language counts and processing statistics over all chunks
+    """
+    stats = {'languages': Counter(), 'successful': 0, 'failed': 0, 'total_length': 0}
+    part_paths = []
+    for chunk_number, chunk_df in enumerate(pd.read_csv(input_path, chunksize=chunksize, escapechar='\\')):
+        print(f"\nChunk {chunk_number + 1} ({len(chunk_df)} rows)")
+        part_path = output_path.with_name(f"{output_path.name}.part{chunk_number}.csv")
+        chunk_processed = process_dataframe_with_checkpoints(chunk_df, save_path=str(part_path), **process_kwargs)
+        _update_statistics(stats, chunk_processed)
+        part_paths.append(part_path)
+    
+    # Parts share the same columns, so they are joined as text without re-parsing
+    with open(output_path, 'w', encoding='utf-8', newline='') as out:
+        for part_number, part_path in enumerate(part_paths):
+            with open(part_path, 'r', encoding='utf-8', newline='') as part:
+                if part_number > 0:
+                    part.readline()  # header
+                shutil.copyfileobj(part, out)
+    for part_path in part_paths:
+        part_path.unlink()
+    
+    return stats
+
+
 def main():
     """Command-line interface for the processing script."""
     parser = argparse.ArgumentParser(
@@ -143,7 +319,7 @@ Examples:
     parser.add_argument(
         '--output',
         required=True,
-        help='Output CSV file path (also used as checkpoint)'
+        help='Output CSV file path (also used as checkpoint); use a .parquet suffix to write Parquet (requires pyarrow)'
     )
     parser.add_argument(
         '--mode',
@@ -161,6 +337,19 @@ Examples:
         default='file',
         help='Name of the ID column for checkpointing (default: "file")'
     )
+    parser.add_argument(
+        '--chunksize',
+        type=int,
+        default=None,
+        help='Read and process the input this many rows at a time to bound memory use; '
+             'each chunk is checkpointed to OUTPUT.partN.csv (default: load the whole file)'
+    )
+    parser.add_argument(
+        '--checkpoint-every',
+        type=int,
+        default=50,
+        help='Rewrite the checkpoint CSV every N processed rows; rows in between are logged to OUTPUT.jsonl (default: 50)'
+    )
     
     args = parser.parse_args()
     
@@ -169,45 +358,54 @@ Examples:
     if not input_path.exists():
         raise FileNotFoundError(f"Input file not found: {args.input}")
     
-    print(f"Loading: {args.input}")
-    df = pd.read_csv(args.input)
-    print(f"Loaded {len(df)} rows")
-    
-    # Process with checkpointing
     output_path = Path(args.output)
+    if output_path.suffix == PARQUET_SUFFIX:
+        if not HAS_PYARROW:
+            raise ImportError("pyarrow is required for a .parquet output. Install it with: pip install pyarrow")
+        if args.chunksize:
+            parser.error("--chunksize writes CSV parts; use a .csv output path")
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    df_processed = process_dataframe_with_checkpoints(
-        df,
-        save_path=str(output_path),
+    process_kwargs = dict(
         mode=args.mode,
         text_column=args.text_column,
-        id_column=args.id_column
+        id_column=args.id_column,
+        checkpoint_every=args.checkpoint_every
     )
     
-    # Final save (already saved during processing, but ensure it's there)
-    df_processed.to_csv(output_path, index=False, escapechar='\\')
+    if args.chunksize:
+        print(f"Processing {args.input} in chunks of {args.chunksize} rows")
+        stats = process_csv_in_chunks(input_path, output_path, args.chunksize, **process_kwargs)
+    else:
+        print(f"Loading: {args.input}")
+        # C engine: extract.py's text cells contain quoted newlines, which
+        # pandas' pyarrow engine cannot parse
+        df = pd.read_csv(args.input, escapechar='\\')
+        print(f"Loaded {len(df)} rows")
+        
+        # Process with checkpointing
+        df_processed = process_dataframe_with_checkpoints(df, save_path=str(output_path), **process_kwargs)
+        
+        # Final save (already saved during processing, but ensure it's there)
+        write_results(df_processed, output_path)
+        
+        stats = {'languages': Counter(), 'successful': 0, 'failed': 0, 'total_length': 0}
+        _update_statistics(stats, df_processed)
     
     print(f"\n✅ Results saved to: {output_path}")
     
-    # Show language distribution if available
-    if 'detected_language' in df_processed.columns:
-        lang_counts = df_processed['detected_language'].value_counts()
-        print(f"\nLanguage distribution:")
-        for lang, count in lang_counts.items():
-            print(f"  {lang}: {count}")
+    # Show language distribution
+    print(f"\nLanguage distribution:")
+    for lang, count in stats['languages'].most_common():
+        print(f"  {lang}: {count}")
     
     # Show processing statistics
-    if 'processed' in df_processed.columns:
-        successful = df_processed['processed'].notna().sum()
-        failed = df_processed['processed'].isna().sum()
-        print(f"\nProcessing statistics:")
-        print(f"  - Successful: {successful}")
-        print(f"  - Failed: {failed}")
-        
-        if successful > 0:
-            avg_length = df_processed['processed'].str.len().mean()
-            print(f"  - Average text length: {avg_length:.0f} characters")
+    print(f"\nProcessing statistics:")
+    print(f"  - Successful: {stats['successful']}")
+    print(f"  - Failed: {stats['failed']}")
+    
+    if stats['successful'] > 0:
+        avg_length = stats['total_length'] / stats['successful']
+        print(f"  - Average text length: {avg_length:.0f} characters")
 
 
 if __name__ == "__main__":
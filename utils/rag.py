@@ -5,44 +5,956 @@ This module provides utilities for working with vector stores and performing
 semantic search on document embeddings for RAG applications.
 """
 
+import hashlib
+import mmap
+import os
 import pickle
+from functools import lru_cache
 import numpy as np
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 from openai import OpenAI
 
+try:
+    import faiss
+    HAS_FAISS = True
+except ImportError:
+    HAS_FAISS = False
 
-def load_vector_store(path: Path) -> Dict[str, Dict[str, Any]]:
+try:
+    from numba import get_num_threads, njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Similarity search backend: "auto" (FAISS if installed, else NumPy; mmapped
+# stores stay on NumPy), "faiss", "numba", "torch" (CUDA, float16) or "numpy".
+# Unavailable backends fall back to NumPy.
+SEARCH_BACKEND = os.getenv("VECTORLAW_SEARCH_BACKEND", "auto").lower()
+
+# Documents with at least this many chunks are scanned by the numba backend
+# on all threads; below it the threading overhead outweighs the work.
+NUMBA_PARALLEL_MIN_ROWS = 65536
+
+
+def _normalize_rows(embeddings: np.ndarray) -> np.ndarray:
+    """
+    Return a contiguous copy of the embeddings with each row scaled to unit L2 norm.
+    
+    Zero rows are left as zeros so they score 0 against every query.
+    """
+    # einsum computes the squared row norms without materializing embeddings**2
+    norms = np.sqrt(np.einsum("ij,ij->i", embeddings, embeddings))[:, None]
+    norms[norms == 0] = 1
+    return np.ascontiguousarray(embeddings / norms, dtype=np.float32)
+
+
+def quantize_embeddings(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quantize embeddings to int8 with one scale per row.
+    
+    Rows are L2-normalized first, so the cosine similarity with a unit query
+    vector is recovered as ``scales * (quantized @ query)``.
+    
+    Args:
+        embeddings: (N, D) float embeddings matrix
+    
+    Returns:
+        Tuple of (int8 (N, D) matrix, float32 (N,) per-row scales)
+    """
+    normed = _normalize_rows(np.asarray(embeddings, dtype=np.float32))
+    scales = np.max(np.abs(normed), axis=1) / 127
+    scales[scales == 0] = 1
+    quantized = np.round(normed / scales[:, None]).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+
+# Rows dequantized per step when scoring int8 embeddings; keeps the float32
+# temporary small instead of materializing the whole matrix
+QUANTIZED_BLOCK_ROWS = 512
+
+
+def _quantized_similarities(quantized: np.ndarray, scales: np.ndarray, queries: np.ndarray) -> np.ndarray:
+    """
+    Cosine similarities between int8-quantized rows and unit query vector(s).
+    
+    Args:
+        quantized: (N, D) int8 matrix from quantize_embeddings
+        scales: (N,) per-row scales from quantize_embeddings
+        queries: Unit query vector (D,) or matrix of unit query vectors (M, D)
+    
+    Returns:
+        Similarities of shape (N,) for a single query or (M, N) for a matrix
+    """
+    n_rows = quantized.shape[0]
+    out = np.empty((n_rows,) + queries.shape[:-1], dtype=np.float32)
+    queries_t = queries.T
+    for start in range(0, n_rows, QUANTIZED_BLOCK_ROWS):
+        stop = min(start + QUANTIZED_BLOCK_ROWS, n_rows)
+        out[start:stop] = quantized[start:stop].astype(np.float32) @ queries_t
+    out *= scales.reshape((n_rows,) + (1,) * (out.ndim - 1))
+    return out.T
+
+
+# Marker key written in the header of stores saved by save_vector_store
+VECTOR_STORE_FORMAT_KEY = "__vector_store_format__"
+VECTOR_STORE_FORMAT_VERSION = 2
+
+# Embedding buffers start on this byte boundary so mmapped arrays stay aligned
+BUFFER_ALIGNMENT = 64
+
+# Vector stores are written sequentially in large pieces; a 1 MiB write buffer
+# keeps the small header/payload writes and alignment padding to few syscalls
+WRITE_BUFFER_SIZE = 1 << 20
+
+
+def _align(offset: int) -> int:
+    """Round a byte offset up to the next BUFFER_ALIGNMENT boundary."""
+    return -(-offset // BUFFER_ALIGNMENT) * BUFFER_ALIGNMENT
+
+
+# Vector stores saved under this suffix use the columnar Parquet layout instead of pickle
+PARQUET_SUFFIX = ".parquet"
+
+
+def _require_pyarrow() -> None:
+    if not HAS_PYARROW:
+        raise ImportError(
+            f"pyarrow is required for {PARQUET_SUFFIX} vector stores. Install it with: pip install pyarrow"
+        )
+
+
+def _write_vector_store_parquet(store: Dict[str, Dict[str, Any]], path: Path) -> None:
+    """
+    Write a vector store as one Parquet table with a row per chunk.
+    
+    Columns are doc_name, chunk_index, text and a fixed-size-list embedding
+    (plus embedding_scale for int8-quantized stores), so other tools can read
+    the store and queries can load only the columns they need. Documents with
+    no chunks have no rows and are not kept.
+    """
+    _require_pyarrow()
+    quantized = [("embedding_scales" in entry) for entry in store.values()]
+    if any(quantized) and not all(quantized):
+        raise ValueError("Cannot write a mix of quantized and float32 entries to Parquet.")
+
+    doc_names: List[str] = []
+    chunk_indices: List[int] = []
+    texts: List[str] = []
+    for doc_name, entry in store.items():
+        doc_names.extend([doc_name] * len(entry["chunks"]))
+        for chunk in entry["chunks"]:
+            chunk_indices.append(chunk["chunk_index"])
+            texts.append(chunk["text"])
+
+    matrices = [np.asarray(entry["embeddings"]) for entry in store.values() if len(entry["chunks"])]
+    dtype = np.int8 if any(quantized) else np.float32
+    if matrices:
+        embeddings = np.ascontiguousarray(np.concatenate(matrices), dtype=dtype)
+    else:
+        embeddings = np.empty((0, 1), dtype=dtype)
+    columns = {
+        "doc_name": pa.array(doc_names, type=pa.string()),
+        "chunk_index": pa.array(chunk_indices, type=pa.int64()),
+        "text": pa.array(texts, type=pa.string()),
+        "embedding": pa.FixedSizeListArray.from_arrays(pa.array(embeddings.reshape(-1)), embeddings.shape[1]),
+    }
+    if any(quantized):
+        columns["embedding_scale"] = pa.array(np.concatenate([
+            np.asarray(entry["embedding_scales"], dtype=np.float32)
+            for entry in store.values() if len(entry["chunks"])
+        ] or [np.empty(0, dtype=np.float32)]))
+    pq.write_table(pa.table(columns), path, compression="zstd")
+
+
+def _read_vector_store_parquet(path: Path) -> Dict[str, Dict[str, Any]]:
+    """Read a Parquet vector store back into the per-document dict layout."""
+    _require_pyarrow()
+    table = pq.read_table(path)
+    doc_names = table.column("doc_name").to_pylist()
+    chunk_indices = table.column("chunk_index").to_pylist()
+    texts = table.column("text").to_pylist()
+    embedding_column = table.column("embedding").combine_chunks()
+    # The flattened values of a null-free fixed-size list are one contiguous buffer
+    embeddings = embedding_column.flatten().to_numpy().reshape(-1, embedding_column.type.list_size)
+    scales = None
+    if "embedding_scale" in table.column_names:
+        scales = table.column("embedding_scale").to_numpy()
+
+    store: Dict[str, Dict[str, Any]] = {}
+    start = 0
+    for row in range(1, len(doc_names) + 1):
+        if row < len(doc_names) and doc_names[row] == doc_names[start]:
+            continue
+        entry = store[doc_names[start]] = {
+            "embeddings": embeddings[start:row],
+            "chunks": [
+                {"chunk_index": chunk_index, "text": text}
+                for chunk_index, text in zip(chunk_indices[start:row], texts[start:row])
+            ],
+        }
+        if scales is not None:
+            entry["embedding_scales"] = scales[start:row]
+        start = row
+    return store
+
+
+def save_vector_store(store: Dict[str, Dict[str, Any]], path: Path, quantize: bool = False) -> None:
+    """
+    Save a vector store using pickle protocol 5 with out-of-band buffers.
+    
+    The file holds a small header pickle, the store pickle (with ndarray payloads
+    replaced by buffer references), then the raw embedding buffers, each aligned
+    to BUFFER_ALIGNMENT bytes. This lets load_vector_store rebuild each embeddings
+    matrix directly on top of the bytes on disk instead of copying them through
+    the pickle stream.
+    
+    A path ending in ``.parquet`` instead writes a zstd-compressed Parquet table
+    with one row per chunk (requires pyarrow).
+    
+    Args:
+        store: Dictionary mapping document names to their embeddings and chunks
+        path: Destination path for the vector store file
+        quantize: If True, store embeddings as int8 with per-row scales
+                  (``embedding_scales``), a quarter of the float32 size
+    """
+    # Derived, load-time fields (normalized copies, memoized flags) are not persisted
+    store = {
+        doc_name: {
+            key: value for key, value in entry.items()
+            if key != "embeddings_normed" and not key.startswith("_")
+        }
+        for doc_name, entry in store.items()
+    }
+    if quantize:
+        for entry in store.values():
+            if "embedding_scales" not in entry:
+                entry["embeddings"], entry["embedding_scales"] = quantize_embeddings(entry["embeddings"])
+
+    if path.suffix == PARQUET_SUFFIX:
+        _write_vector_store_parquet(store, path)
+        return
+
+    buffers: List[pickle.PickleBuffer] = []
+    payload = pickle.dumps(store, protocol=5, buffer_callback=buffers.append)
+    raw_buffers = [buf.raw() for buf in buffers]
+
+    # Buffer offsets are relative to the (aligned) end of the payload
+    buffer_offsets = []
+    offset = 0
+    for raw in raw_buffers:
+        buffer_offsets.append(offset)
+        offset = _align(offset + raw.nbytes)
+
+    header = pickle.dumps(
+        {
+            VECTOR_STORE_FORMAT_KEY: VECTOR_STORE_FORMAT_VERSION,
+            "payload_size": len(payload),
+            "buffer_sizes": [raw.nbytes for raw in raw_buffers],
+            "buffer_offsets": buffer_offsets,
+        },
+        protocol=5,
+    )
+    region_start = _align(len(header) + len(payload))
+
+    with open(path, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+        f.write(header)
+        f.write(payload)
+        for raw, rel_offset in zip(raw_buffers, buffer_offsets):
+            f.seek(region_start + rel_offset)
+            f.write(raw)
+
+
+def _read_vector_store_file(path: Path, use_mmap: bool = False) -> Tuple[Dict[str, Dict[str, Any]], bool]:
+    """
+    Read a vector store file without validating or preparing its entries.
+    
+    Returns:
+        Tuple of (store, mapped) where mapped is True if embedding buffers are
+        memory-mapped views of the file
+    """
+    if path.suffix == PARQUET_SUFFIX:
+        return _read_vector_store_parquet(path), False
+
+    mapped = False
+    with open(path, "rb") as f:
+        header = pickle.load(f)
+        if isinstance(header, dict) and VECTOR_STORE_FORMAT_KEY in header:
+            payload_start = f.tell()
+            region_start = _align(payload_start + header["payload_size"])
+            buffers: List[Any] = []
+            if use_mmap and header["buffer_sizes"]:
+                # The mapping stays valid after the file is closed
+                view = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+                for size, rel_offset in zip(header["buffer_sizes"], header["buffer_offsets"]):
+                    start = region_start + rel_offset
+                    buffers.append(view[start:start + size])
+                mapped = True
+            else:
+                for size, rel_offset in zip(header["buffer_sizes"], header["buffer_offsets"]):
+                    buf = bytearray(size)
+                    f.seek(region_start + rel_offset)
+                    f.readinto(buf)
+                    buffers.append(buf)
+            f.seek(payload_start)
+            store = pickle.load(f, buffers=buffers)
+        else:
+            # Legacy store: the first pickle in the file is the store itself
+            store = header
+    return store, mapped
+
+
+def _validate_chunks(doc_name: str, entry: Dict[str, Any]) -> None:
+    """
+    Check that an entry's chunks are a list of dicts aligned with its embedding rows.
+    
+    Raises:
+        ValueError: If the chunks do not follow the schema written by embed.py
+    """
+    chunks = entry["chunks"]
+    if not isinstance(chunks, list) or len(chunks) != len(entry["embeddings"]):
+        raise ValueError(
+            f"Document '{doc_name}' has chunks that are not a list aligned with its embeddings. "
+            "Convert the store with migrate_vector_store() first."
+        )
+    if chunks and not isinstance(chunks[0], dict):
+        raise ValueError(
+            f"Document '{doc_name}' has chunks that are not dictionaries. "
+            "Convert the store with migrate_vector_store() first."
+        )
+
+
+def load_vector_store(path: Path, use_mmap: bool = False) -> Dict[str, Dict[str, Any]]:
     """
     Load a vector store from a pickle file.
     
+    Stores written by save_vector_store are read with their out-of-band buffers,
+    so embeddings are reconstructed without an extra copy. Plain pickled stores
+    from older versions of embed.py are still supported, and ``.parquet`` stores
+    are read with pyarrow.
+    
     Args:
         path: Path to the vector store pickle file
+        use_mmap: If True, memory-map the embedding buffers instead of reading them
+                  into RAM. Pages are only loaded for documents that are actually
+                  queried. The NumPy backend then keeps just per-row norms in
+                  memory instead of a normalized copy; other backends build
+                  normalized embeddings on first query. Ignored for legacy
+                  pickle stores and Parquet stores.
     
     Returns:
-        Dictionary mapping document names to their embeddings and chunks
+        Dictionary mapping document names to their embeddings and chunks.
+        Each entry also carries an ``embeddings_normed`` matrix with unit-norm
+        rows so cosine similarity reduces to a single matrix-vector product
+        (quantized stores keep their int8 ``embeddings`` and ``embedding_scales``
+        instead).
+    
+    Raises:
+        ValueError: If an entry's chunks are not a list of dicts with one chunk
+                    per embedding row (see migrate_vector_store)
     """
     if not path.exists():
         raise FileNotFoundError(f"Vector store not found at {path}. Create embeddings first.")
     
-    with open(path, "rb") as f:
-        store = pickle.load(f)
+    store, mapped = _read_vector_store_file(path, use_mmap)
     
-    # Ensure embeddings are numpy arrays after unpickling
-    for entry in store.values():
-        entry["embeddings"] = np.array(entry["embeddings"], dtype=np.float32)
+    # embed.py pickles contiguous (N, D) float32 matrices; only older stores
+    # holding lists of per-chunk vectors need to be converted here. Unaligned or
+    # strided buffers are copied too, so matmul always gets a BLAS-friendly layout.
+    for doc_name, entry in store.items():
+        if "embedding_scales" in entry:
+            # int8-quantized rows are already normalized
+            _validate_chunks(doc_name, entry)
+            continue
+        embeddings = entry["embeddings"]
+        if not (
+            isinstance(embeddings, np.ndarray)
+            and embeddings.dtype == np.float32
+            and embeddings.flags.c_contiguous
+            and embeddings.flags.aligned
+        ):
+            entry["embeddings"] = np.ascontiguousarray(embeddings, dtype=np.float32)
+        _validate_chunks(doc_name, entry)
+        if mapped:
+            entry["_mapped"] = True
+        elif entry["embeddings"].ndim == 2:
+            entry["embeddings_normed"] = _normalize_rows(entry["embeddings"])
     
     return store
 
 
+def migrate_vector_store(path: Path, output_path: Optional[Path] = None) -> Path:
+    """
+    Rewrite an older vector store into the current schema and file format.
+    
+    Chunks stored as dicts (keyed by row index, or by other keys in positional
+    order) or as plain strings become a list of {'chunk_index', 'text'} dicts
+    aligned with the embedding rows. Rows with no matching chunk are dropped
+    together with their embeddings.
+    
+    Args:
+        path: Path to the existing vector store file
+        output_path: Where to write the migrated store (defaults to overwriting path)
+    
+    Returns:
+        Path the migrated store was written to
+    """
+    if not path.exists():
+        raise FileNotFoundError(f"Vector store not found at {path}.")
+    
+    store, _ = _read_vector_store_file(path)
+    for entry in store.values():
+        embeddings = np.asarray(entry["embeddings"])
+        if "embedding_scales" not in entry:
+            embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        chunks = _normalize_chunks(entry["chunks"], len(embeddings))
+        keep = [i for i, chunk in enumerate(chunks) if chunk is not None]
+        if len(keep) < len(chunks):
+            embeddings = embeddings[keep]
+            if "embedding_scales" in entry:
+                entry["embedding_scales"] = np.asarray(entry["embedding_scales"])[keep]
+        entry["embeddings"] = np.ascontiguousarray(embeddings)
+        entry["chunks"] = [chunks[i] for i in keep]
+    
+    output_path = output_path or path
+    save_vector_store(store, output_path)
+    return output_path
+
+
+# On-disk cache of query embeddings, one raw float32 file per (model, query)
+EMBEDDING_CACHE_DIR = Path(
+    os.getenv("VECTORLAW_CACHE_DIR", "~/.cache/vectorlaw")
+).expanduser() / "embeds"
+
+
+def _embedding_cache_path(embedding_model: str, text: str) -> Path:
+    """Return the cache file path for an embedding of text under embedding_model."""
+    key = hashlib.sha256(f"{embedding_model}\0{text}".encode("utf-8")).hexdigest()
+    return EMBEDDING_CACHE_DIR / f"{key}.f32"
+
+
+def _read_cached_embedding(embedding_model: str, text: str) -> Optional[np.ndarray]:
+    """Load a cached embedding from disk, or return None on a cache miss."""
+    path = _embedding_cache_path(embedding_model, text)
+    if not path.exists():
+        return None
+    vector = np.fromfile(path, dtype=np.float32)
+    vector.flags.writeable = False
+    return vector
+
+
+def _write_cached_embedding(embedding_model: str, text: str, vector: np.ndarray) -> None:
+    """Persist an embedding to the disk cache. Failures are ignored."""
+    path = _embedding_cache_path(embedding_model, text)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so concurrent readers never see a partial file
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        vector.tofile(tmp_path)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+@lru_cache(maxsize=4096)
+def _embed_query(client: OpenAI, embedding_model: str, text: str) -> np.ndarray:
+    """
+    Embed a single query, using the in-process LRU and the on-disk cache.
+    
+    The returned array is shared between callers and is marked read-only.
+    """
+    vector = _read_cached_embedding(embedding_model, text)
+    if vector is not None:
+        return vector
+    
+    embedding = client.embeddings.create(
+        model=embedding_model,
+        input=[text]
+    ).data[0].embedding
+    vector = np.asarray(embedding, dtype=np.float32)
+    _write_cached_embedding(embedding_model, text, vector)
+    vector.flags.writeable = False
+    return vector
+
+
+@lru_cache(maxsize=512)
+def embed_and_normalize(client: OpenAI, embedding_model: str, text: str) -> np.ndarray:
+    """
+    Return the unit-norm float32 embedding of a text, memoized per process.
+    
+    Used for RAG queries and by ClassificationCache for summaries. Repeat texts
+    skip both the embedding lookup and the normalization. The returned array
+    is shared between callers and is marked read-only.
+    
+    Args:
+        client: OpenAI client instance
+        embedding_model: Embedding model to use
+        text: Text to embed
+    
+    Returns:
+        Read-only unit-norm float32 embedding
+    """
+    vector = _embed_query(client, embedding_model, text)
+    normed = np.ascontiguousarray(vector / (np.sqrt(np.vdot(vector, vector)) + 1e-8), dtype=np.float32)
+    normed.flags.writeable = False
+    return normed
+
+
+class ProximityCache:
+    """
+    Cache of recent query results keyed by query embedding similarity.
+    
+    A lookup hits when a previous query against the same document (with the same
+    top_k) has an embedding whose cosine similarity with the new one exceeds tau,
+    in which case the stored results are returned without searching the document.
+    The least recently used entry is evicted once capacity is reached.
+    """
+
+    def __init__(self, capacity: int = 256, tau: float = 0.86):
+        """
+        Args:
+            capacity: Maximum number of cached queries
+            tau: Minimum cosine similarity between query embeddings for a hit
+        """
+        self.capacity = capacity
+        self.tau = tau
+        self._keys: np.ndarray = np.empty((0, 0), dtype=np.float32)
+        self._scopes: List[Optional[tuple]] = [None] * capacity
+        self._results: List[Optional[List[Dict[str, Any]]]] = [None] * capacity
+        self._last_used = np.zeros(capacity, dtype=np.int64)
+        self._clock = 0
+
+    def lookup(self, doc_name: str, top_k: int, query_normed: np.ndarray) -> Optional[List[Dict[str, Any]]]:
+        """Return cached results for a near-duplicate query, or None on a miss."""
+        if self._keys.shape[0] == 0 or self._keys.shape[1] != query_normed.shape[0]:
+            return None
+        scope = (doc_name, top_k)
+        rows = [i for i, s in enumerate(self._scopes) if s == scope]
+        if not rows:
+            return None
+        sims = self._keys[rows] @ query_normed
+        best = int(np.argmax(sims))
+        if sims[best] <= self.tau:
+            return None
+        row = rows[best]
+        self._clock += 1
+        self._last_used[row] = self._clock
+        return [dict(result) for result in self._results[row]]
+
+    def insert(self, doc_name: str, top_k: int, query_normed: np.ndarray, results: List[Dict[str, Any]]) -> None:
+        """Store results for a query, evicting the least recently used entry if full."""
+        if self.capacity <= 0:
+            return
+        if self._keys.shape[1] != query_normed.shape[0]:
+            # First insert (or embedding dimension changed): start over
+            self._keys = np.zeros((self.capacity, query_normed.shape[0]), dtype=np.float32)
+            self._scopes = [None] * self.capacity
+            self._results = [None] * self.capacity
+            self._last_used[:] = 0
+        row = int(np.argmin(self._last_used))
+        self._clock += 1
+        self._keys[row] = query_normed
+        self._scopes[row] = (doc_name, top_k)
+        self._results[row] = [dict(result) for result in results]
+        self._last_used[row] = self._clock
+
+
+def _get_doc_entry(store: Dict[str, Dict[str, Any]], doc_name: str) -> Dict[str, Any]:
+    """Look up a document entry, raising a KeyError that lists the available names."""
+    doc_entry = store.get(doc_name)
+    if doc_entry is None:
+        available = ", ".join(sorted(store.keys()))
+        raise KeyError(f"Document '{doc_name}' not in vector store. Available names: {available}")
+    return doc_entry
+
+
+def _get_normed_embeddings(doc_entry: Dict[str, Any]) -> np.ndarray:
+    """Return the entry's unit-norm embeddings, computing and caching them if needed."""
+    # Stores built in memory (not via load_vector_store) are normalized on first query
+    doc_normed = doc_entry.get("embeddings_normed")
+    if doc_normed is None:
+        doc_normed = _normalize_rows(np.asarray(doc_entry["embeddings"], dtype=np.float32))
+        doc_entry["embeddings_normed"] = doc_normed
+    return doc_normed
+
+
+def _get_row_norms(doc_entry: Dict[str, Any]) -> np.ndarray:
+    """Return the entry's row L2 norms (zeros replaced by 1), computing them once."""
+    norms = doc_entry.get("_doc_norms")
+    if norms is None:
+        embeddings = doc_entry["embeddings"]
+        norms = np.sqrt(np.einsum("ij,ij->i", embeddings, embeddings))
+        norms[norms == 0] = 1
+        doc_entry["_doc_norms"] = norms
+    return norms
+
+
+def _use_row_norms(doc_entry: Dict[str, Any]) -> bool:
+    """Whether to score raw rows against cached norms rather than a normalized copy."""
+    return bool(doc_entry.get("_mapped")) and "embeddings_normed" not in doc_entry
+
+
+def _similarities(doc_entry: Dict[str, Any], queries: np.ndarray) -> np.ndarray:
+    """
+    Cosine similarities between a document's chunks and unit query vector(s).
+    
+    Args:
+        doc_entry: The document's vector store entry
+        queries: Unit query vector (D,) or matrix of unit query vectors (M, D)
+    
+    Returns:
+        Similarities of shape (N,) for a single query or (M, N) for a matrix
+    """
+    scales = doc_entry.get("embedding_scales")
+    if scales is not None:
+        return _quantized_similarities(doc_entry["embeddings"], scales, queries)
+    if _use_row_norms(doc_entry):
+        # mmapped stores: divide by cached norms instead of copying normalized rows
+        return (queries @ doc_entry["embeddings"].T) / _get_row_norms(doc_entry)
+    doc_normed = _get_normed_embeddings(doc_entry)
+    if queries.ndim == 1:
+        return doc_normed @ queries
+    return queries @ doc_normed.T
+
+
+def _top_k_indices(similarities: np.ndarray, top_k: int) -> np.ndarray:
+    """Indices of the top_k highest similarities, ordered from most to least similar."""
+    k = min(top_k, similarities.size)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    # Partial selection of the top k, then sort only those k entries
+    part = np.argpartition(-similarities, k - 1)[:k]
+    return part[np.argsort(-similarities[part])]
+
+
+# Target bytes of embeddings scored per block by the NumPy search path, sized
+# to stay in L2 alongside the query vector
+SEARCH_BLOCK_BYTES = 1 << 20
+MIN_SEARCH_BLOCK_ROWS = 256
+
+
+def _blocked_topk(
+    embeddings: np.ndarray,
+    query: np.ndarray,
+    k: int,
+    row_norms: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Top-k inner products between unit-norm rows and a unit query, scored block by block.
+    
+    Each block of rows is multiplied with the query and its best k candidates
+    merged into a running top-k, so no N-long similarity vector is allocated.
+    If row_norms is given, rows are not unit-norm and each block's scores are
+    divided by the matching norms.
+    
+    Returns:
+        Tuple of (indices, scores) sorted from most to least similar
+    """
+    n_rows, dim = embeddings.shape
+    block_rows = max(MIN_SEARCH_BLOCK_ROWS, SEARCH_BLOCK_BYTES // (dim * embeddings.itemsize))
+    best_indices = np.empty(0, dtype=np.intp)
+    best_scores = np.empty(0, dtype=np.float32)
+    # One scores buffer reused by every block's sgemv
+    scores_buffer = np.empty(min(block_rows, n_rows), dtype=np.float32)
+    for start in range(0, n_rows, block_rows):
+        block = embeddings[start:start + block_rows]
+        block_scores = np.matmul(block, query, out=scores_buffer[:len(block)])
+        if row_norms is not None:
+            block_scores /= row_norms[start:start + len(block)]
+        block_top = _top_k_indices(block_scores, k)
+        candidate_indices = np.concatenate([best_indices, block_top + start])
+        candidate_scores = np.concatenate([best_scores, block_scores[block_top]])
+        keep = _top_k_indices(candidate_scores, k)
+        best_indices = candidate_indices[keep]
+        best_scores = candidate_scores[keep]
+    return best_indices, best_scores
+
+
+def _heap_scan_kernel(embeddings, query, start, stop, heap_scores, heap_indices):
+    """
+    Score rows [start, stop) against query, keeping the best in a size-k min-heap.
+    
+    heap_scores/heap_indices are updated in place; the heap minimum is at
+    position 0, so most rows cost one dot product and one comparison.
+    """
+    k = heap_scores.shape[0]
+    dim = embeddings.shape[1]
+    for i in range(start, stop):
+        score = np.float32(0.0)
+        for d in range(dim):
+            score += embeddings[i, d] * query[d]
+        if score <= heap_scores[0]:
+            continue
+        # Replace the heap minimum and sift down
+        heap_scores[0] = score
+        heap_indices[0] = i
+        pos = 0
+        while True:
+            left = 2 * pos + 1
+            if left >= k:
+                break
+            child = left
+            if left + 1 < k and heap_scores[left + 1] < heap_scores[left]:
+                child = left + 1
+            if heap_scores[child] >= heap_scores[pos]:
+                break
+            heap_scores[pos], heap_scores[child] = heap_scores[child], heap_scores[pos]
+            heap_indices[pos], heap_indices[child] = heap_indices[child], heap_indices[pos]
+            pos = child
+
+
+def _topk_cosine_kernel(embeddings, query, k):
+    """
+    Single pass over unit-norm rows keeping a size-k min-heap of (score, index).
+    
+    Compiled with numba when available; avoids materializing the N-long
+    similarity vector. This is the project's compiled search core, since there
+    is no build step for C extensions. Returns (indices, scores) sorted from
+    most to least similar.
+    """
+    heap_scores = np.full(k, -np.inf, dtype=np.float32)
+    heap_indices = np.full(k, -1, dtype=np.int64)
+    _heap_scan(embeddings, query, 0, embeddings.shape[0], heap_scores, heap_indices)
+    order = np.argsort(-heap_scores)
+    return heap_indices[order], heap_scores[order]
+
+
+def _topk_cosine_parallel_kernel(embeddings, query, k, n_blocks):
+    """
+    Parallel variant of _topk_cosine_kernel for large documents.
+    
+    Rows are split into n_blocks contiguous ranges scanned concurrently, each
+    into its own heap; the n_blocks * k candidates are then merged with one
+    sort. Returns (indices, scores) sorted from most to least similar.
+    """
+    n_rows = embeddings.shape[0]
+    block_size = (n_rows + n_blocks - 1) // n_blocks
+    heap_scores = np.full((n_blocks, k), -np.inf, dtype=np.float32)
+    heap_indices = np.full((n_blocks, k), -1, dtype=np.int64)
+    for b in prange(n_blocks):
+        start = b * block_size
+        stop = min(start + block_size, n_rows)
+        _heap_scan(embeddings, query, start, stop, heap_scores[b], heap_indices[b])
+    flat_scores = heap_scores.ravel()
+    flat_indices = heap_indices.ravel()
+    order = np.argsort(-flat_scores)[:k]
+    return flat_indices[order], flat_scores[order]
+
+
+if HAS_NUMBA:
+    _heap_scan = njit(_heap_scan_kernel)
+    _topk_cosine_serial = njit(_topk_cosine_kernel)
+    _topk_cosine_parallel = njit(parallel=True)(_topk_cosine_parallel_kernel)
+
+
+def _topk_cosine(embeddings: np.ndarray, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Fused numba top-k, scanning large documents on all threads."""
+    n_threads = get_num_threads()
+    if n_threads > 1 and len(embeddings) >= NUMBA_PARALLEL_MIN_ROWS:
+        return _topk_cosine_parallel(embeddings, query, k, n_threads)
+    return _topk_cosine_serial(embeddings, query, k)
+
+
+@lru_cache(maxsize=1)
+def _load_torch_cuda():
+    """
+    Import torch and probe for CUDA on first use of the torch backend.
+    
+    Kept out of module import so other backends don't pay for loading torch
+    or initializing the CUDA driver.
+    
+    Returns:
+        The torch module if CUDA is available, otherwise None
+    """
+    try:
+        import torch
+    except ImportError:
+        return None
+    return torch if torch.cuda.is_available() else None
+
+
+def _get_torch_embeddings(doc_entry: Dict[str, Any], torch) -> "torch.Tensor":
+    """Return the entry's normalized embeddings as a float16 CUDA tensor, uploading once."""
+    tensor = doc_entry.get("_torch")
+    if tensor is None:
+        doc_normed = _get_normed_embeddings(doc_entry)
+        tensor = torch.from_numpy(doc_normed).to("cuda", dtype=torch.float16)
+        doc_entry["_torch"] = tensor
+    return tensor
+
+
+def _get_faiss_index(doc_entry: Dict[str, Any]) -> "faiss.IndexFlatIP":
+    """Return the entry's inner-product FAISS index, building it on first use."""
+    index = doc_entry.get("_faiss")
+    if index is None:
+        doc_normed = _get_normed_embeddings(doc_entry)
+        index = faiss.IndexFlatIP(doc_normed.shape[1])
+        index.add(doc_normed)
+        doc_entry["_faiss"] = index
+    return index
+
+
+def _search(doc_entry: Dict[str, Any], queries: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the top_k most similar chunks for unit query vector(s).
+    
+    float32 stores use the backend chosen by SEARCH_BACKEND: a FAISS
+    IndexFlatIP, the fused numba kernel, a float16 CUDA matmul with
+    torch.topk, or NumPy with a cache-blocked partial sort.
+    Quantized stores always use NumPy, as do memory-mapped stores under "auto".
+    
+    Args:
+        doc_entry: The document's vector store entry
+        queries: Unit query vector (D,) or matrix of unit query vectors (M, D)
+        top_k: Number of results per query
+    
+    Returns:
+        Tuple of (indices, scores), ordered from most to least similar, with
+        shape (k,) for a single query or (M, k) for a matrix
+    """
+    # No-op for vectors from embed_and_normalize; guards callers passing other layouts
+    queries = np.ascontiguousarray(queries, dtype=np.float32)
+    k = min(top_k, len(doc_entry["embeddings"]))
+    if k <= 0:
+        empty_shape = queries.shape[:-1] + (0,)
+        return np.empty(empty_shape, dtype=np.intp), np.empty(empty_shape, dtype=np.float32)
+
+    if "embedding_scales" not in doc_entry:
+        # "auto" leaves memory-mapped stores to the row-norm path below: a FAISS
+        # index would copy every mapped row into RAM
+        use_faiss = SEARCH_BACKEND == "faiss" or (SEARCH_BACKEND == "auto" and not doc_entry.get("_mapped"))
+        if HAS_FAISS and use_faiss:
+            scores, indices = _get_faiss_index(doc_entry).search(np.atleast_2d(queries), k)
+            if queries.ndim == 1:
+                return indices[0], scores[0]
+            return indices, scores
+        torch = _load_torch_cuda() if SEARCH_BACKEND == "torch" else None
+        if torch is not None:
+            doc_tensor = _get_torch_embeddings(doc_entry, torch)
+            query_tensor = torch.from_numpy(np.ascontiguousarray(queries)).to("cuda", dtype=torch.float16)
+            similarities = query_tensor @ doc_tensor.T
+            scores, indices = torch.topk(similarities, k, dim=-1)
+            return indices.cpu().numpy(), scores.float().cpu().numpy()
+        if HAS_NUMBA and SEARCH_BACKEND == "numba":
+            doc_normed = _get_normed_embeddings(doc_entry)
+            if queries.ndim == 1:
+                return _topk_cosine(doc_normed, queries, k)
+            rows = [_topk_cosine(doc_normed, query, k) for query in queries]
+            return np.stack([r[0] for r in rows]), np.stack([r[1] for r in rows])
+
+    if queries.ndim == 1 and "embedding_scales" not in doc_entry:
+        if _use_row_norms(doc_entry):
+            return _blocked_topk(doc_entry["embeddings"], queries, k, _get_row_norms(doc_entry))
+        return _blocked_topk(_get_normed_embeddings(doc_entry), queries, k)
+
+    similarities = _similarities(doc_entry, queries)
+    if similarities.ndim == 1:
+        top_indices = _top_k_indices(similarities, k)
+        return top_indices, similarities[top_indices]
+
+    # Partial selection of the top k columns per row, then order just those
+    top_unsorted = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(similarities, top_unsorted, axis=1)
+    order = np.argsort(-top_scores, axis=1)
+    return (
+        np.take_along_axis(top_unsorted, order, axis=1),
+        np.take_along_axis(top_scores, order, axis=1),
+    )
+
+
+def _normalize_chunks(chunks: Any, n_rows: int) -> List[Optional[Dict[str, Any]]]:
+    """
+    Convert legacy chunk metadata into a list aligned with embedding rows.
+    
+    Used by migrate_vector_store. Chunks may be stored as a list, or as a dict keyed by row index (int or str)
+    or by other keys in positional order. Each row becomes a dict with
+    'chunk_index' and 'text' keys, or None if no chunk matches that row.
+    
+    Args:
+        chunks: The document's chunk metadata (list or dict)
+        n_rows: Number of embedding rows in the document
+    
+    Returns:
+        List of length n_rows with one normalized chunk (or None) per row
+    """
+    normalized: List[Optional[Dict[str, Any]]] = [None] * n_rows
+    if isinstance(chunks, list):
+        def lookup(i):
+            return chunks[i] if i < len(chunks) else None
+    elif isinstance(chunks, dict):
+        # Dicts keyed by something other than the row index fall back to position
+        chunk_keys = sorted(chunks, key=lambda x: int(x) if str(x).isdigit() else float('inf'))
+        def lookup(i):
+            if i in chunks:
+                return chunks[i]
+            if str(i) in chunks:
+                return chunks[str(i)]
+            return chunks[chunk_keys[i]] if i < len(chunk_keys) else None
+    else:
+        return normalized
+
+    for i in range(n_rows):
+        chunk_meta = lookup(i)
+        if chunk_meta is None:
+            continue
+        # Extract chunk data - handle both dict and direct access
+        if isinstance(chunk_meta, dict):
+            normalized[i] = {
+                "chunk_index": chunk_meta.get("chunk_index", i),
+                "text": chunk_meta.get("text", ""),
+            }
+        else:
+            normalized[i] = {"chunk_index": i, "text": str(chunk_meta)}
+    return normalized
+
+
+def _collect_results(
+    doc_entry: Dict[str, Any],
+    top_indices: np.ndarray,
+    top_scores: np.ndarray
+) -> List[Dict[str, Any]]:
+    """
+    Build result dictionaries for the given chunk indices.
+    
+    Args:
+        doc_entry: The document's vector store entry
+        top_indices: Chunk indices ordered from most to least similar
+        top_scores: Similarity score for each index in top_indices
+    
+    Returns:
+        List of dictionaries with 'chunk_index', 'similarity', and 'text' keys
+    """
+    chunks = doc_entry["chunks"]
+    # tolist() converts to Python ints/floats in one call instead of per element
+    return [
+        {
+            "chunk_index": chunks[idx]["chunk_index"],
+            "similarity": score,
+            "text": chunks[idx]["text"],
+        }
+        for idx, score in zip(
+            top_indices.tolist(),
+            np.asarray(top_scores, dtype=np.float64).tolist(),
+        )
+    ]
+
+
 def query_document(
     store: Dict[str, Dict[str, Any]], 
     client: OpenAI, 
     doc_name: str, 
     query: str, 
     top_k: int = 3, 
-    embedding_model: str = "text-embedding-3-large"
+    embedding_model: str = "text-embedding-3-large",
+    proximity_cache: Optional[ProximityCache] = None
 ) -> List[Dict[str, Any]]:
     """
     Query a document in the vector store and return top_k most similar chunks.
@@ -55,73 +967,193 @@ def query_document(
         top_k: Number of top results to return
         embedding_model: Model to use for embedding the query.
                         Must match the model used to create the stored embeddings.
+        proximity_cache: Optional ProximityCache; near-duplicate queries against
+                        the same document return the cached results.
     
     Returns:
         List of dictionaries with 'chunk_index', 'similarity', and 'text' keys
     """
-    doc_entry = store.get(doc_name)
-    if doc_entry is None:
-        available = ", ".join(sorted(store.keys()))
-        raise KeyError(f"Document '{doc_name}' not in vector store. Available names: {available}")
+    doc_entry = _get_doc_entry(store, doc_name)
 
-    query_embedding = client.embeddings.create(
-        model=embedding_model,
-        input=[query]
-    ).data[0].embedding
+    query_vector = embed_and_normalize(client, embedding_model, query)
 
-    doc_embeddings = doc_entry["embeddings"]
-    if not len(doc_embeddings):
+    if not len(doc_entry["embeddings"]):
         return []
 
-    query_vector = np.array(query_embedding, dtype=np.float32)
-    query_norm = np.linalg.norm(query_vector)
-    doc_norms = np.linalg.norm(doc_embeddings, axis=1)
-    similarities = (doc_embeddings @ query_vector) / (doc_norms * query_norm + 1e-8)
+    if proximity_cache is not None:
+        cached = proximity_cache.lookup(doc_name, top_k, query_vector)
+        if cached is not None:
+            return cached
 
-    top_indices = similarities.argsort()[-top_k:][::-1]
+    top_indices, top_scores = _search(doc_entry, query_vector, top_k)
 
-    results: List[Dict[str, Any]] = []
-    chunks = doc_entry["chunks"]
+    results = _collect_results(doc_entry, top_indices, top_scores)
+    if proximity_cache is not None:
+        proximity_cache.insert(doc_name, top_k, query_vector, results)
+    return results
+
+
+def query_documents_batch(
+    store: Dict[str, Dict[str, Any]],
+    client: OpenAI,
+    doc_name: str,
+    queries: List[str],
+    top_k: int = 3,
+    embedding_model: str = "text-embedding-3-large"
+) -> List[List[Dict[str, Any]]]:
+    """
+    Query a document with several queries using a single embeddings request.
     
-    # Handle both list and dict structures for chunks
-    for idx in top_indices:
-        idx_int = int(idx)  # Ensure we have a Python int, not numpy int64
-        if isinstance(chunks, list):
-            # If chunks is a list, access by index
-            if idx_int < len(chunks):
-                chunk_meta = chunks[idx_int]
-            else:
-                continue
-        elif isinstance(chunks, dict):
-            # If chunks is a dict, we need to find the chunk with matching index
-            if idx_int in chunks:
-                chunk_meta = chunks[idx_int]
-            elif str(idx_int) in chunks:
-                chunk_meta = chunks[str(idx_int)]
-            else:
-                # If dict is keyed by other values, try to get by position
-                chunk_keys = sorted(chunks.keys(), key=lambda x: int(x) if str(x).isdigit() else float('inf'))
-                if idx_int < len(chunk_keys):
-                    chunk_meta = chunks[chunk_keys[idx_int]]
-                else:
-                    continue
-        else:
-            continue
-            
-        # Extract chunk data - handle both dict and direct access
-        if isinstance(chunk_meta, dict):
-            chunk_index_val = chunk_meta.get("chunk_index", idx)
-            chunk_text = chunk_meta.get("text", "")
-        else:
-            # If chunk_meta is not a dict, try to extract from it
-            chunk_index_val = idx
-            chunk_text = str(chunk_meta)
-            
-        results.append(
-            {
-                "chunk_index": chunk_index_val,
-                "similarity": float(similarities[idx]),
-                "text": chunk_text,
-            }
+    Args:
+        store: The vector store dictionary
+        client: OpenAI client instance
+        doc_name: Name of the document to query
+        queries: Query strings
+        top_k: Number of top results to return per query
+        embedding_model: Model to use for embedding the queries.
+                        Must match the model used to create the stored embeddings.
+    
+    Returns:
+        One list of results per query, in the same order as queries. Each result
+        is a dictionary with 'chunk_index', 'similarity', and 'text' keys.
+    """
+    doc_entry = _get_doc_entry(store, doc_name)
+    if not queries:
+        return []
+
+    # Only queries missing from the disk cache are sent to the API
+    query_vectors = [_read_cached_embedding(embedding_model, query) for query in queries]
+    missing = [i for i, vector in enumerate(query_vectors) if vector is None]
+    if missing:
+        response = client.embeddings.create(
+            model=embedding_model,
+            input=[queries[i] for i in missing]
         )
-    return results
+        # OpenAI returns embeddings in the same order as inputs
+        for i, item in zip(missing, response.data):
+            vector = np.asarray(item.embedding, dtype=np.float32)
+            _write_cached_embedding(embedding_model, queries[i], vector)
+            query_vectors[i] = vector
+
+    if not len(doc_entry["embeddings"]):
+        return [[] for _ in queries]
+
+    query_matrix = np.stack(query_vectors).astype(np.float32)
+    query_norms = np.sqrt(np.einsum("ij,ij->i", query_matrix, query_matrix))[:, None]
+    query_matrix /= query_norms + 1e-8
+    top_indices, top_scores = _search(doc_entry, query_matrix, top_k)
+
+    return [
+        _collect_results(doc_entry, row_indices, row_scores)
+        for row_indices, row_scores in zip(top_indices, top_scores)
+    ]
+
+
+class FlatIndex:
+    """
+    All documents' normalized embeddings concatenated into one (total_chunks, D) matrix.
+    
+    Querying every document is then one matrix-vector product over a contiguous
+    array instead of one small product per document. Build it once per loaded
+    store and reuse it across queries; rebuild it if the store changes.
+    
+    Only in-memory float32 documents are concatenated. Memory-mapped and int8
+    quantized documents would have to be copied into float32 RAM, so they are
+    searched per query on their own paths (row norms, dequantized blocks) and
+    merged into the results.
+    """
+
+    def __init__(self, store: Dict[str, Dict[str, Any]]):
+        """
+        Args:
+            store: The vector store dictionary
+        """
+        self.doc_names: List[str] = []
+        # Documents kept out of the concatenated matrix (see class docstring)
+        self.separate_doc_names: List[str] = []
+        matrices: List[np.ndarray] = []
+        for doc_name, doc_entry in store.items():
+            if not len(doc_entry["embeddings"]):
+                continue
+            if "embedding_scales" in doc_entry or doc_entry.get("_mapped"):
+                self.separate_doc_names.append(doc_name)
+                continue
+            matrices.append(_get_normed_embeddings(doc_entry))
+            self.doc_names.append(doc_name)
+        self.store = store
+        self.embeddings = np.concatenate(matrices) if matrices else np.empty((0, 0), dtype=np.float32)
+        # offsets[i] is the first row of doc_names[i]
+        self.offsets = np.cumsum([0] + [len(m) for m in matrices[:-1]]).astype(np.intp)
+
+    def search(self, query_normed: np.ndarray, top_k: int) -> List[Dict[str, Any]]:
+        """
+        Find the top_k most similar chunks across all documents.
+        
+        Args:
+            query_normed: Unit query vector
+            top_k: Number of results to return
+        
+        Returns:
+            List of dictionaries with 'doc_name', 'chunk_index', 'similarity',
+            and 'text' keys, ordered from most to least similar
+        """
+        # (similarity, doc_name, row within the document)
+        candidates: List[Tuple[float, str, int]] = []
+        if len(self.embeddings):
+            similarities = self.embeddings @ query_normed
+            top_indices = _top_k_indices(similarities, top_k)
+            doc_positions = np.searchsorted(self.offsets, top_indices, side="right") - 1
+            for row, doc_pos, score in zip(
+                top_indices.tolist(),
+                doc_positions.tolist(),
+                np.asarray(similarities[top_indices], dtype=np.float64).tolist(),
+            ):
+                candidates.append((score, self.doc_names[doc_pos], row - int(self.offsets[doc_pos])))
+        for doc_name in self.separate_doc_names:
+            indices, scores = _search(self.store[doc_name], query_normed, top_k)
+            for row, score in zip(indices.tolist(), np.asarray(scores, dtype=np.float64).tolist()):
+                candidates.append((score, doc_name, row))
+        if self.separate_doc_names:
+            # Stable sort keeps the concatenated matrix's order among ties
+            candidates = sorted(candidates, key=lambda c: c[0], reverse=True)[:top_k]
+        
+        results = []
+        for score, doc_name, row in candidates:
+            chunk = self.store[doc_name]["chunks"][row]
+            results.append({
+                "doc_name": doc_name,
+                "chunk_index": chunk["chunk_index"],
+                "similarity": score,
+                "text": chunk["text"],
+            })
+        return results
+
+
+def query_all_documents(
+    store: Dict[str, Dict[str, Any]],
+    client: OpenAI,
+    query: str,
+    top_k: int = 3,
+    embedding_model: str = "text-embedding-3-large",
+    flat_index: Optional[FlatIndex] = None
+) -> List[Dict[str, Any]]:
+    """
+    Query every document in the vector store at once and return the top_k chunks overall.
+    
+    Args:
+        store: The vector store dictionary
+        client: OpenAI client instance
+        query: Query string
+        top_k: Number of top results to return
+        embedding_model: Model to use for embedding the query.
+                        Must match the model used to create the stored embeddings.
+        flat_index: FlatIndex built from store; pass one to reuse it across
+                    queries (built on the fly otherwise)
+    
+    Returns:
+        List of dictionaries with 'doc_name', 'chunk_index', 'similarity', and 'text' keys
+    """
+    query_vector = embed_and_normalize(client, embedding_model, query)
+    if flat_index is None:
+        flat_index = FlatIndex(store)
+    return flat_index.search(query_vector, top_k)
@@ -9,37 +9,94 @@ Supports both PDF files and HTML web pages.
 import os
 import re
 import argparse
+import multiprocessing
+import tempfile
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 from urllib.parse import urlparse, unquote
 from io import BytesIO
-from typing import Optional, Tuple
+from typing import Any, Callable, Iterator, Optional, Tuple, Union
 
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+try:
+    from .extract import extract_pdf_text_pdfium
+except ImportError:
+    # Imported with utils/ itself on sys.path (as the scripts do)
+    from extract import extract_pdf_text_pdfium
+
+# selectolax (Lexbor, C) is preferred for HTML; BeautifulSoup is the fallback,
+# with lxml as its parser when installed
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    HAS_SELECTOLAX = True
+except ImportError:
+    HAS_SELECTOLAX = False
+
+# httpx with h2 enables an optional HTTP/2 client (--http2)
+try:
+    import httpx
+    import h2  # noqa: F401 (required by httpx for HTTP/2)
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+
 try:
     from bs4 import BeautifulSoup
     HAS_BS4 = True
 except ImportError:
     HAS_BS4 = False
 
+try:
+    import lxml  # noqa: F401 (only needed as a BeautifulSoup parser)
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+# pypdfium2 (PDFium, C++) is preferred; PyPDF2 is the pure-Python fallback
+try:
+    import pypdfium2  # noqa: F401 (pages are read by extract_pdf_text_pdfium)
+    HAS_PYPDFIUM2 = True
+except ImportError:
+    HAS_PYPDFIUM2 = False
+
 try:
     import PyPDF2
     HAS_PYPDF2 = True
 except ImportError:
     HAS_PYPDF2 = False
 
+# Bytes per read when streaming PDF downloads to disk
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/119.0.0.0 Safari/537.36"
+)
+
+REQUEST_ERRORS = (requests.RequestException, httpx.HTTPError) if HAS_HTTPX else (requests.RequestException,)
+
+# Elements dropped from HTML pages before extracting their text
+NON_CONTENT_TAGS = ("script", "style", "nav", "header", "footer")
+
+# Placeholder lines in URL lists, and characters not allowed in filenames
+_NA_RE = re.compile(r"^(n/?a|none|null)$", re.IGNORECASE)
+_SANITIZE_RE = re.compile(r'[\\/:*?"<>|]+')
+
 
 def sanitize_filename(name: str) -> str:
     """Sanitize filename by removing invalid characters."""
-    return re.sub(r'[\\/:*?"<>|]+', "_", name).strip()
+    return _SANITIZE_RE.sub("_", name).strip()
 
 
 def build_scraping_session(
     total_retries: int = 3,
     backoff_factor: float = 0.5,
     status_forcelist: tuple = (429, 500, 502, 503, 504),
+    pool_maxsize: int = 32,
 ) -> requests.Session:
     """
     Create a requests session with retry logic and exponential backoff.
@@ -48,6 +105,8 @@ def build_scraping_session(
         total_retries: Maximum number of retries
         backoff_factor: Backoff multiplier for retries
         status_forcelist: HTTP status codes that trigger retries
+        pool_maxsize: Connections kept per host (at least the number of
+                      threads sharing the session)
     
     Returns:
         Configured requests Session
@@ -62,19 +121,44 @@ def build_scraping_session(
         allowed_methods=("GET", "HEAD"),
         raise_on_status=False,
     )
-    adapter = HTTPAdapter(max_retries=retry)
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
     session.mount("http://", adapter)
     session.mount("https://", adapter)
-    session.headers.update({
-        "User-Agent": (
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/119.0.0.0 Safari/537.36"
-        )
-    })
+    session.headers.update({"User-Agent": USER_AGENT})
     return session
 
 
+def build_http2_client(total_retries: int = 3, max_connections: int = 32) -> "httpx.Client":
+    """
+    Create an httpx client that speaks HTTP/2 where servers support it.
+    
+    Concurrent requests to the same host are multiplexed over one connection,
+    so TLS handshakes are shared. Unlike build_scraping_session, retries only
+    cover failed connections, not HTTP error statuses.
+    
+    Args:
+        total_retries: Maximum number of connection retries
+        max_connections: Maximum number of open connections (at least the
+                         number of threads sharing the client)
+    
+    Returns:
+        Configured httpx Client
+    """
+    if not HAS_HTTPX:
+        raise ImportError("httpx with HTTP/2 support is required. Install with: pip install 'httpx[http2]'")
+    transport = httpx.HTTPTransport(
+        http2=True,
+        retries=total_retries,
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+    )
+    return httpx.Client(
+        transport=transport,
+        headers={"User-Agent": USER_AGENT},
+        timeout=30,
+        follow_redirects=True,
+    )
+
+
 def is_pdf_response(response: requests.Response, url: str) -> bool:
     """Check if response is a PDF based on content-type or URL."""
     content_type = response.headers.get("Content-Type", "").lower()
@@ -83,68 +167,165 @@ def is_pdf_response(response: requests.Response, url: str) -> bool:
     return is_pdf_content or is_pdf_url
 
 
-def extract_text_from_pdf(content: bytes) -> str:
-    """
-    Extract text from PDF bytes using PyPDF2.
-    
-    Args:
-        content: PDF file content as bytes
-    
-    Returns:
-        Extracted text
-    """
-    if not HAS_PYPDF2:
+def _extract_pdf_text(source: Union[BytesIO, str]) -> str:
+    """Extract text from a PDF file object or path with pypdfium2, or PyPDF2 if it is not installed."""
+    if not (HAS_PYPDFIUM2 or HAS_PYPDF2):
         raise ImportError(
-            "PyPDF2 is required for PDF extraction. Install with: pip install PyPDF2"
+            "pypdfium2 or PyPDF2 is required for PDF extraction. Install with: pip install pypdfium2"
         )
     
     try:
-        text = ""
-        reader = PyPDF2.PdfReader(BytesIO(content))
+        if HAS_PYPDFIUM2:
+            return extract_pdf_text_pdfium(source)
+        
+        pages = []
+        reader = PyPDF2.PdfReader(source)
         for page in reader.pages:
             try:
-                text += page.extract_text() or ""
+                pages.append(page.extract_text() or "")
             except Exception:
                 continue
-        return text
+        return "".join(pages)
     except Exception as e:
         raise ValueError(f"PDF extraction failed: {e}")
 
 
-def extract_text_from_html(response: requests.Response) -> str:
+def extract_text_from_pdf(content: bytes) -> str:
     """
-    Extract text from HTML response using BeautifulSoup.
+    Extract text from PDF bytes using pypdfium2, or PyPDF2 if it is not installed.
     
     Args:
-        response: requests Response object with HTML content
+        content: PDF file content as bytes
+    
+    Returns:
+        Extracted text
+    """
+    return _extract_pdf_text(BytesIO(content))
+
+
+def extract_text_from_pdf_path(path: Union[str, Path]) -> str:
+    """
+    Extract text from a PDF file on disk using pypdfium2, or PyPDF2 if it is not installed.
+    
+    The file is read by the PDF library directly, so it never has to be held
+    in memory as a whole.
+    
+    Args:
+        path: Path to the PDF file
     
     Returns:
         Extracted text
     """
-    if not HAS_BS4:
+    return _extract_pdf_text(str(path))
+
+
+def extract_text_from_html_string(html: str) -> str:
+    """
+    Extract text from an HTML document using selectolax, or BeautifulSoup if it is not installed.
+    
+    Args:
+        html: HTML document as a string
+    
+    Returns:
+        Extracted text
+    """
+    if not (HAS_SELECTOLAX or HAS_BS4):
         raise ImportError(
-            "BeautifulSoup4 is required for HTML extraction. "
-            "Install with: pip install beautifulsoup4"
+            "selectolax or BeautifulSoup4 is required for HTML extraction. "
+            "Install with: pip install selectolax"
         )
     
-    soup = BeautifulSoup(response.text, "html.parser")
+    # Remove script, style and page chrome elements, then get the text
+    if HAS_SELECTOLAX:
+        tree = LexborHTMLParser(html)
+        tree.strip_tags(list(NON_CONTENT_TAGS))
+        text = tree.root.text(separator="") if tree.root is not None else ""
+    else:
+        soup = BeautifulSoup(html, "lxml" if HAS_LXML else "html.parser")
+        for tag in soup.select(", ".join(NON_CONTENT_TAGS)):
+            tag.decompose()
+        text = soup.get_text()
     
-    # Remove script and style elements
-    for script in soup(["script", "style", "nav", "header", "footer"]):
-        script.decompose()
+    # Collapse all whitespace runs in one pass
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def extract_text_from_html(response: requests.Response) -> str:
+    """
+    Extract text from HTML response using selectolax, or BeautifulSoup if it is not installed.
     
-    # Get text and clean it up
-    text = soup.get_text()
+    Args:
+        response: requests Response object with HTML content
     
-    # Clean up whitespace
-    lines = (line.strip() for line in text.splitlines())
-    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-    text = " ".join(chunk for chunk in chunks if chunk)
+    Returns:
+        Extracted text
+    """
+    return extract_text_from_html_string(response.text)
+
+
+def _save_text(
+    response: Any,
+    iter_chunks: Callable[[int], Iterator[bytes]],
+    url: str,
+    dest_path: Path,
+    index: int,
+    extract_pool: Optional[Executor] = None
+) -> Tuple[bool, str, str]:
+    """
+    Extract text from a successful response and write it to dest_path/{index}.txt.
+    
+    Parsing runs in extract_pool when one is given, otherwise in the calling thread.
+    """
+    def run(extract_fn: Callable[[str], str], source: str) -> str:
+        if extract_pool is None:
+            return extract_fn(source)
+        return extract_pool.submit(extract_fn, source).result()
     
-    return text
+    # Determine content type
+    if is_pdf_response(response, url):
+        # PDF file
+        tmp_path = None
+        try:
+            # Stream to a temporary file instead of holding the whole PDF in memory
+            with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+                tmp_path = tmp.name
+                for block in iter_chunks(DOWNLOAD_CHUNK_SIZE):
+                    tmp.write(block)
+            text = run(extract_text_from_pdf_path, tmp_path)
+            filename = f"{index}.txt"
+            full_path = dest_path / filename
+            
+            with open(full_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            
+            return True, filename, ""
+        except Exception as e:
+            return False, "", f"PDF extraction failed: {str(e)}"
+        finally:
+            if tmp_path is not None:
+                os.unlink(tmp_path)
+    else:
+        # HTML page
+        try:
+            text = run(extract_text_from_html_string, response.text)
+            filename = f"{index}.txt"
+            full_path = dest_path / filename
+            
+            with open(full_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            
+            return True, filename, ""
+        except Exception as e:
+            return False, "", f"HTML extraction failed: {str(e)}"
 
 
-def download_and_extract(url: str, dest_path: Path, index: int, session: Optional[requests.Session] = None) -> Tuple[bool, str, str]:
+def download_and_extract(
+    url: str,
+    dest_path: Path,
+    index: int,
+    session: Optional[Any] = None,
+    extract_pool: Optional[Executor] = None
+) -> Tuple[bool, str, str]:
     """
     Download a URL and extract text content.
     Handles both PDFs and HTML pages.
@@ -153,7 +334,10 @@ def download_and_extract(url: str, dest_path: Path, index: int, session: Optiona
         url: URL to download
         dest_path: Destination folder
         index: File index number
-        session: Optional requests Session (for retry logic)
+        session: Optional requests Session (for retry logic) or httpx Client
+                 from build_http2_client
+        extract_pool: Optional process pool for PDF/HTML parsing, which is
+                      CPU-bound and would otherwise hold the GIL in fetch threads
     
     Returns:
         Tuple of (success: bool, filename: str, error_message: str)
@@ -165,41 +349,23 @@ def download_and_extract(url: str, dest_path: Path, index: int, session: Optiona
         close_session = False
     
     try:
+        if HAS_HTTPX and isinstance(session, httpx.Client):
+            with session.stream("GET", url) as response:
+                if not response.is_success:
+                    return False, "", f"HTTP {response.status_code}: {response.reason_phrase}"
+                if not is_pdf_response(response, url):
+                    # HTML is parsed from response.text, which needs the whole body
+                    response.read()
+                return _save_text(response, response.iter_bytes, url, dest_path, index, extract_pool)
+        
         response = session.get(url, stream=True, timeout=30, allow_redirects=True)
         
         if not response.ok:
             return False, "", f"HTTP {response.status_code}: {response.reason}"
         
-        # Determine content type
-        if is_pdf_response(response, url):
-            # PDF file
-            try:
-                content = response.content
-                text = extract_text_from_pdf(content)
-                filename = f"{index}.txt"
-                full_path = dest_path / filename
-                
-                with open(full_path, "w", encoding="utf-8") as f:
-                    f.write(text)
-                
-                return True, filename, ""
-            except Exception as e:
-                return False, "", f"PDF extraction failed: {str(e)}"
-        else:
-            # HTML page
-            try:
-                text = extract_text_from_html(response)
-                filename = f"{index}.txt"
-                full_path = dest_path / filename
-                
-                with open(full_path, "w", encoding="utf-8") as f:
-                    f.write(text)
-                
-                return True, filename, ""
-            except Exception as e:
-                return False, "", f"HTML extraction failed: {str(e)}"
+        return _save_text(response, response.iter_content, url, dest_path, index, extract_pool)
     
-    except requests.RequestException as e:
+    except REQUEST_ERRORS as e:
         return False, "", f"Request failed: {str(e)}"
     except Exception as e:
         return False, "", f"Unexpected error: {str(e)}"
@@ -240,6 +406,25 @@ Examples:
         default=3,
         help="Maximum number of retries for failed requests (default: 3)"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=16,
+        help="Number of URLs to fetch concurrently (default: 16)"
+    )
+    parser.add_argument(
+        "--extract-workers",
+        type=int,
+        default=None,
+        help="Number of processes parsing downloaded PDFs and HTML pages; 1 parses in the "
+             "fetching threads (default: min(CPU count, 8))"
+    )
+    parser.add_argument(
+        "--http2",
+        action="store_true",
+        help="Fetch with an HTTP/2 httpx client that multiplexes requests to the same host "
+             "(requires httpx[http2]; retries cover connection errors only)"
+    )
     
     args = parser.parse_args()
 
@@ -247,56 +432,79 @@ Examples:
     out_dir.mkdir(parents=True, exist_ok=True)
 
     # Check dependencies
-    if not HAS_BS4:
-        print("⚠️  Warning: beautifulsoup4 not installed. HTML extraction will fail.")
-        print("   Install with: pip install beautifulsoup4")
+    if not (HAS_SELECTOLAX or HAS_BS4):
+        print("⚠️  Warning: neither selectolax nor beautifulsoup4 is installed. HTML extraction will fail.")
+        print("   Install with: pip install selectolax")
     
-    if not HAS_PYPDF2:
-        print("⚠️  Warning: PyPDF2 not installed. PDF extraction will fail.")
-        print("   Install with: pip install PyPDF2")
+    if not (HAS_PYPDFIUM2 or HAS_PYPDF2):
+        print("⚠️  Warning: neither pypdfium2 nor PyPDF2 is installed. PDF extraction will fail.")
+        print("   Install with: pip install pypdfium2")
 
     # Read URLs
     with open(args.urls_file, "r", encoding="utf-8") as f:
-        urls = [
-            line.strip()
-            for line in f
-            if line.strip() and not re.match(r"^(n/?a|none|null)$", line.strip(), flags=re.IGNORECASE)
-        ]
+        stripped = (line.strip() for line in f)
+        urls = [line for line in stripped if line and not _NA_RE.match(line)]
 
     print(f"Processing {len(urls)} URLs...")
     print(f"Output directory: {out_dir}\n")
 
-    # Create session with retry logic
-    session = build_scraping_session(total_retries=args.max_retries)
+    # Create session with retry logic; requests sessions and httpx clients are
+    # safe to share between threads for GETs, with one pooled connection per worker
+    if args.http2 and HAS_HTTPX:
+        session = build_http2_client(total_retries=args.max_retries, max_connections=max(args.workers, 10))
+    else:
+        if args.http2:
+            print("⚠️  Warning: httpx[http2] not installed. Falling back to requests over HTTP/1.1.")
+            print("   Install with: pip install 'httpx[http2]'\n")
+        session = build_scraping_session(total_retries=args.max_retries, pool_maxsize=max(args.workers, 10))
     
     successful = 0
     failed = 0
     skipped = 0
 
+    tasks = []
     for idx, url in enumerate(urls, start=1):
-        filename = f"{idx}.txt"
-        full_path = out_dir / filename
-
-        if full_path.exists():
+        if (out_dir / f"{idx}.txt").exists():
             print(f"[{idx}] ✓ Already exists — skipped.")
             skipped += 1
-            continue
+        else:
+            tasks.append((idx, url))
 
-        print(f"[{idx}] Fetching {url[:80]}...", end=" ")
-        success, saved_filename, error = download_and_extract(url, out_dir, idx, session)
-        
-        if success:
-            if full_path.exists():
-                char_count = full_path.stat().st_size
-                print(f"✓ Success ({char_count:,} bytes)")
+    # Fetching is network-bound, so threads overlap the waits; parsing is
+    # CPU-bound, so it is handed to worker processes. Results are reported as
+    # they complete
+    extract_workers = args.extract_workers or min(os.cpu_count() or 1, 8)
+    # Spawned, not forked: the pool starts its workers from inside fetch threads,
+    # and forking while other threads hold HTTP-client, logging or stdio locks
+    # can deadlock the children
+    extract_pool = ProcessPoolExecutor(
+        max_workers=extract_workers,
+        mp_context=multiprocessing.get_context("spawn")
+    ) if extract_workers > 1 else None
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = {
+            executor.submit(download_and_extract, url, out_dir, idx, session, extract_pool): (idx, url)
+            for idx, url in tasks
+        }
+        for future in as_completed(futures):
+            idx, url = futures[future]
+            success, saved_filename, error = future.result()
+            full_path = out_dir / f"{idx}.txt"
+            
+            if success:
+                if full_path.exists():
+                    char_count = full_path.stat().st_size
+                    print(f"[{idx}] ✓ {url[:80]} ({char_count:,} bytes)")
+                else:
+                    print(f"[{idx}] ✓ {url[:80]}")
+                successful += 1
             else:
-                print(f"✓ Success")
-            successful += 1
-        else:
-            print(f"✗ Failed: {error}")
-            failed += 1
+                print(f"[{idx}] ✗ {url[:80]} Failed: {error}")
+                failed += 1
 
     session.close()
+    if extract_pool is not None:
+        extract_pool.shutdown()
 
     # Summary
     print(f"\n✅ Download complete!")
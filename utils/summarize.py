@@ -8,13 +8,83 @@ of the documents (e.g., sectoral focus, market failures, etc.).
 """
 
 import os
+import json
+import asyncio
+import hashlib
 import argparse
+import functools
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 import tiktoken
 
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import AsyncOpenAI
+
+try:
+    from rs_bpe.bpe import openai as rs_bpe_openai
+    HAS_RS_BPE = True
+except ImportError:
+    HAS_RS_BPE = False
+
+try:
+    import tokendagger
+    HAS_TOKENDAGGER = True
+except ImportError:
+    HAS_TOKENDAGGER = False
+
+try:
+    import aiofiles
+    HAS_AIOFILES = True
+except ImportError:
+    HAS_AIOFILES = False
+
+# Tokenizer backend: "auto" (rs-bpe if installed, else TokenDagger, else
+# tiktoken), "rs_bpe", "tokendagger" or "tiktoken". All use tiktoken's
+# vocabularies, so token counts are the same; unavailable backends fall back
+# to tiktoken.
+BPE_BACKEND = os.getenv("VECTORLAW_BPE_BACKEND", "auto").lower()
+
+
+class _RsBpeEncoding:
+    """Adapter exposing an rs-bpe tokenizer through the tiktoken methods used here."""
+
+    def __init__(self, tokenizer: Any):
+        self._tokenizer = tokenizer
+
+    def encode(self, text: str) -> List[int]:
+        return self._tokenizer.encode(text)
+
+    def encode_batch(self, texts: List[str], num_threads: int = 1) -> List[List[int]]:
+        return [self._tokenizer.encode(text) for text in texts]
+
+    def decode(self, tokens: List[int]) -> str:
+        # rs-bpe returns None when the tokens end inside a multi-byte character;
+        # drop the incomplete trailing tokens like tiktoken's replacement would
+        for end in range(len(tokens), max(len(tokens) - 4, 0), -1):
+            text = self._tokenizer.decode(tokens[:end])
+            if text is not None:
+                return text
+        return ""
+
+
+@functools.lru_cache(maxsize=8)
+def _get_enc(encoding: str) -> Any:
+    """Return the encoder for a model name on BPE_BACKEND, loading each one only once."""
+    try:
+        name = tiktoken.encoding_name_for_model(encoding)
+    except KeyError:
+        name = "cl100k_base"
+    if HAS_RS_BPE and BPE_BACKEND in ("auto", "rs_bpe") and name in ("cl100k_base", "o200k_base"):
+        return _RsBpeEncoding(getattr(rs_bpe_openai, name)())
+    enc = tiktoken.get_encoding(name)
+    if HAS_TOKENDAGGER and BPE_BACKEND in ("auto", "tokendagger"):
+        return tokendagger.Encoding(
+            name,
+            pat_str=enc._pat_str,
+            mergeable_ranks=enc._mergeable_ranks,
+            special_tokens=enc._special_tokens
+        )
+    return enc
 
 
 def prompt_token_count(prompt: str, encoding: str = "gpt-4") -> int:
@@ -28,11 +98,7 @@ def prompt_token_count(prompt: str, encoding: str = "gpt-4") -> int:
     Returns:
         Number of tokens
     """
-    try:
-        enc = tiktoken.encoding_for_model(encoding)
-    except KeyError:
-        enc = tiktoken.get_encoding("cl100k_base")
-    return len(enc.encode(prompt))
+    return len(_get_enc(encoding).encode(prompt))
 
 
 def available_tokens_for_doc(
@@ -55,15 +121,54 @@ def available_tokens_for_doc(
         Maximum tokens available for document text
     """
     # Estimate length of the largest prompt (prompt is built from doc_text)
-    prompt_overhead = max([prompt_token_count(p, encoding) for p in doc_prompts]) if doc_prompts else 0
+    prompt_overhead = _max_prompt_tokens(doc_prompts, encoding)
     # Just to be sure, allow a safety margin on top of the max_tokens
     return max_tokens - prompt_overhead - safety_margin
 
 
+def _max_prompt_tokens(prompts: List[str], encoding: str = "gpt-4") -> int:
+    """Token count of the longest prompt (0 for no prompts)."""
+    # encode_batch tokenizes the prompts in parallel threads outside the GIL
+    return max(
+        (len(tokens) for tokens in _get_enc(encoding).encode_batch(prompts, num_threads=os.cpu_count() or 1)),
+        default=0
+    )
+
+
+# Prompt templates are the same for every document, so their token counts are
+# measured once per run (keyed on the prompt-building function) rather than
+# re-tokenizing the templates, or whole documents, for each document
+
+@functools.lru_cache(maxsize=32)
+def _prompts_overhead(get_prompts_func: Callable[[str], List[str]], encoding: str) -> int:
+    """Tokens of the largest prompt built around a one-character placeholder document."""
+    return _max_prompt_tokens(get_prompts_func("X"), encoding)
+
+
+@functools.lru_cache(maxsize=32)
+def _document_prompt_overhead(
+    get_document_prompt: Callable[[str], str],
+    questions: Tuple[str, ...],
+    encoding: str
+) -> int:
+    """Tokens of the empty document prompt plus the longest question."""
+    return _max_prompt_tokens([get_document_prompt("") + question for question in questions], encoding)
+
+
+# Upper bound on characters per token used to cut text before tokenizing it.
+# Real BPE tokens average ~4 characters, so the cut never binds on ordinary text.
+MAX_CHARS_PER_TOKEN = 8
+
+
 def truncate_text_to_token_limit(text: str, max_tokens: int, encoding: str = "gpt-4") -> str:
     """
     Truncate text so its tokenized length is <= max_tokens.
     
+    Text longer than max_tokens * MAX_CHARS_PER_TOKEN characters is cut on
+    characters first: tiktoken's encode is super-linear on long inputs without
+    whitespace (e.g. scraped HTML or minified data), and encoding a multi-MB
+    document only to keep its first max_tokens tokens could stall a worker.
+    
     Args:
         text: Text to truncate
         max_tokens: Maximum number of tokens
@@ -72,10 +177,19 @@ def truncate_text_to_token_limit(text: str, max_tokens: int, encoding: str = "gp
     Returns:
         Truncated text
     """
-    try:
-        enc = tiktoken.encoding_for_model(encoding)
-    except KeyError:
-        enc = tiktoken.get_encoding("cl100k_base")
+    # Every token covers at least one UTF-8 byte, so text with no more bytes
+    # than max_tokens fits without tokenizing it (isascii() is O(1))
+    if len(text) <= max_tokens and (text.isascii() or len(text.encode("utf-8")) <= max_tokens):
+        return text
+    enc = _get_enc(encoding)
+    char_limit = max_tokens * MAX_CHARS_PER_TOKEN
+    if 0 < char_limit < len(text):
+        print(f"  ⚠️  Truncating document from {len(text)} characters to at most {max_tokens} tokens.")
+        text = text[:char_limit]
+        tokens = enc.encode(text)
+        if len(tokens) > max_tokens:
+            text = enc.decode(tokens[:max_tokens])
+        return text
     tokens = enc.encode(text)
     if len(tokens) > max_tokens:
         print(f"  ⚠️  Truncating document from {len(tokens)} tokens to {max_tokens} tokens.")
@@ -84,41 +198,273 @@ def truncate_text_to_token_limit(text: str, max_tokens: int, encoding: str = "gp
     return text
 
 
-def perform_summarization(
-    client: OpenAI,
+def read_document(doc_path: Path, max_tokens: int = 128000) -> str:
+    """
+    Read a text document, stopping at the character cap used for truncation.
+    
+    Everything past max_tokens * MAX_CHARS_PER_TOKEN characters would be cut by
+    truncate_text_to_token_limit anyway, so large scrape dumps are not loaded
+    whole.
+    
+    Args:
+        doc_path: UTF-8 text file
+        max_tokens: Maximum context window size
+    
+    Returns:
+        Document text, possibly cut at the character cap
+    """
+    with open(doc_path, encoding="utf-8", buffering=1024 * 1024) as f:
+        return f.read(max_tokens * MAX_CHARS_PER_TOKEN)
+
+
+# On-disk cache of LLM responses, one UTF-8 text file per (model, messages)
+RESPONSE_CACHE_DIR = Path(
+    os.getenv("VECTORLAW_CACHE_DIR", "~/.cache/vectorlaw")
+).expanduser() / "responses"
+
+
+def _response_cache_path(model: str, messages: List[Dict[str, Any]]) -> Path:
+    """Return the cache file path for a response to messages under model."""
+    key = hashlib.sha256(json.dumps([model, messages]).encode("utf-8")).hexdigest()
+    return RESPONSE_CACHE_DIR / f"{key}.txt"
+
+
+def _read_cached_response(model: str, messages: List[Dict[str, Any]]) -> Optional[str]:
+    """Load a cached response from disk, or return None on a cache miss."""
+    path = _response_cache_path(model, messages)
+    try:
+        return path.read_text(encoding="utf-8")
+    except OSError:
+        return None
+
+
+def _write_cached_response(model: str, messages: List[Dict[str, Any]], response: str) -> None:
+    """Persist a response to the disk cache. Failures are ignored."""
+    path = _response_cache_path(model, messages)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so concurrent readers never see a partial file
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(response, encoding="utf-8")
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def _summary_messages(
+    system_prompt: str,
+    prompt: str,
+    shared_prompt: Optional[str] = None,
+    cache_control: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Build the chat messages for one summary request.
+    
+    With a shared_prompt (the document), the messages are the system prompt,
+    the document, then the question, so everything but the short final message
+    is byte-identical across a document's questions and can be served from
+    provider-side prompt caches. cache_control marks the system and document
+    blocks with Anthropic-style ``cache_control`` breakpoints (passed through
+    by OpenRouter); OpenAI caches matching prefixes automatically.
+    """
+    if shared_prompt is None:
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ]
+    if cache_control:
+        ephemeral = {"type": "ephemeral"}
+        system_content = [{"type": "text", "text": system_prompt, "cache_control": ephemeral}]
+        shared_content = [{"type": "text", "text": shared_prompt, "cache_control": ephemeral}]
+    else:
+        system_content = system_prompt
+        shared_content = shared_prompt
+    return [
+        {"role": "system", "content": system_content},
+        {"role": "user", "content": shared_content},
+        {"role": "user", "content": prompt}
+    ]
+
+
+class RateLimitedSemaphore(asyncio.Semaphore):
+    """
+    Semaphore that also starts at most requests_per_minute acquisitions per minute.
+    
+    Acquisitions are spaced evenly, 60 / requests_per_minute seconds apart, so
+    bursts of requests stay under a provider's per-minute request limit
+    instead of being answered with 429s.
+    """
+
+    def __init__(self, value: int, requests_per_minute: float):
+        super().__init__(value)
+        self._interval = 60.0 / requests_per_minute
+        self._next_start = 0.0
+
+    async def acquire(self) -> bool:
+        await super().acquire()
+        now = asyncio.get_running_loop().time()
+        start = max(now, self._next_start)
+        self._next_start = start + self._interval
+        if start > now:
+            try:
+                await asyncio.sleep(start - now)
+            except BaseException:
+                self.release()
+                raise
+        return True
+
+
+async def _complete(
+    client: AsyncOpenAI,
+    semaphore: asyncio.Semaphore,
+    messages: List[Dict[str, Any]],
+    model: str,
+    use_cache: bool = True
+) -> str:
+    """Send one request once a concurrency slot is free, unless its response is cached."""
+    if use_cache:
+        cached = _read_cached_response(model, messages)
+        if cached is not None:
+            return cached
+    async with semaphore:
+        response = await client.chat.completions.create(model=model, messages=messages)
+    text_response = response.choices[0].message.content
+    if use_cache and text_response is not None:
+        _write_cached_response(model, messages, text_response)
+    return text_response
+
+
+async def perform_summarization(
+    client: AsyncOpenAI,
     doc_prompts: List[str],
     system_prompt: str,
-    model: str = "gpt-4o-mini"
+    model: str = "gpt-4o-mini",
+    semaphore: Optional[asyncio.Semaphore] = None,
+    use_cache: bool = True,
+    shared_prompt: Optional[str] = None,
+    cache_control: bool = False,
+    on_summary: Optional[Callable[[int, str], Awaitable[None]]] = None
 ) -> List[str]:
     """
-    Generate summaries for a list of prompts.
+    Generate summaries for a list of prompts, with all requests in flight concurrently.
     
     Args:
-        client: OpenAI client instance
+        client: AsyncOpenAI client instance
         doc_prompts: List of prompts to summarize
         system_prompt: System prompt for the LLM
         model: Model to use for summarization
+        semaphore: Limits requests in flight; share one across documents to
+                   bound the total (default: a new one allowing 10)
+        use_cache: Reuse responses from the on-disk cache (RESPONSE_CACHE_DIR)
+                   for identical (model, messages) and store new ones
+        shared_prompt: Message sent before every prompt (e.g. the document);
+                       see _summary_messages
+        cache_control: Add prompt cache breakpoints (see _summary_messages)
+        on_summary: Awaited with (index in doc_prompts, summary) as soon as
+                    each summary arrives, e.g. to save it
     
     Returns:
-        List of summary texts
+        List of summary texts, in the order of doc_prompts
+    
+    Raises:
+        Exception: The first error of any request, after all have finished
     """
-    summaries = []
-    for idx, prompt in enumerate(doc_prompts):
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt}
-            ]
-        )
-        text_response = response.choices[0].message.content
-        summaries.append(text_response)
-        print(f"  ✓ Generated summary {idx + 1}/{len(doc_prompts)}")
-    return summaries
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(10)
+    
+    async def summarize(idx: int, prompt: str) -> str:
+        messages = _summary_messages(system_prompt, prompt, shared_prompt, cache_control)
+        summary = await _complete(client, semaphore, messages, model, use_cache)
+        if on_summary is not None:
+            await on_summary(idx, summary)
+        return summary
+    
+    pending = [summarize(idx, prompt) for idx, prompt in enumerate(doc_prompts)]
+    first = []
+    if shared_prompt is not None and len(pending) > 1:
+        # Let one request write the shared prefix to the provider's cache before
+        # the others are sent; requests racing it would all miss
+        first = await asyncio.gather(pending.pop(0), return_exceptions=True)
+    results = first + await asyncio.gather(*pending, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
 
 
-def summarize_document(
-    client: OpenAI,
+def prepare_document_prompt(
+    doc_text: str,
+    get_document_prompt: Callable[[str], str],
+    questions: List[str],
+    max_tokens: int = 128000,
+    safety_margin: int = 1024,
+    encoding: str = "gpt-4"
+) -> str:
+    """
+    Build a document's shared prompt, truncating doc_text so it fits in context
+    together with the longest question.
+    
+    Args:
+        doc_text: Document text to summarize
+        get_document_prompt: Function that takes doc_text and returns the shared document prompt
+        questions: Question prompts sent after the document prompt
+        max_tokens: Maximum context window size
+        safety_margin: Tokens to reserve for system messages
+        encoding: Encoding model to use
+    
+    Returns:
+        Shared document prompt built from the (possibly truncated) document text
+    """
+    # Overhead is everything except the document: its wrapper plus the longest question
+    prompt_overhead = _document_prompt_overhead(get_document_prompt, tuple(questions), encoding)
+    max_allowed_tokens = max_tokens - prompt_overhead - safety_margin
+    doc_text = truncate_text_to_token_limit(doc_text, max_allowed_tokens, encoding)
+    return get_document_prompt(doc_text)
+
+
+def prepare_prompts(
+    doc_text: str,
+    get_prompts_func,
+    max_tokens: int = 128000,
+    safety_margin: int = 1024,
+    encoding: str = "gpt-4"
+) -> List[str]:
+    """
+    Build a document's prompts, truncating doc_text so every prompt fits in context.
+    
+    Args:
+        doc_text: Document text to summarize
+        get_prompts_func: Function that takes doc_text and returns list of prompts
+        max_tokens: Maximum context window size
+        safety_margin: Tokens to reserve for system messages
+        encoding: Encoding model to use
+    
+    Returns:
+        List of prompts built from the (possibly truncated) document text
+    """
+    # Step 1: Measure the prompt overhead without the document (a one-character
+    # placeholder stands in for it), once per prompts function
+    # Calculate maximum allowed tokens in doc_text (subtracting prompt overhead and margin)
+    max_allowed_tokens = max_tokens - _prompts_overhead(get_prompts_func, encoding) - safety_margin
+    
+    # Step 2: Actually truncate doc_text to fit
+    doc_text = truncate_text_to_token_limit(doc_text, max_allowed_tokens, encoding)
+    
+    # Step 3: Build prompts (using truncated doc_text)
+    return get_prompts_func(doc_text)
+
+
+async def _write_text(path: Path, text: str) -> None:
+    """Write a UTF-8 text file without blocking the event loop."""
+    if HAS_AIOFILES:
+        async with aiofiles.open(path, "w", encoding="utf-8") as f:
+            await f.write(text)
+    else:
+        await asyncio.to_thread(path.write_text, text, encoding="utf-8")
+
+
+async def summarize_document(
+    client: AsyncOpenAI,
     doc_text: str,
     doc_name: str,
     output_dir: Path,
@@ -127,51 +473,155 @@ def summarize_document(
     max_tokens: int = 128000,
     safety_margin: int = 1024,
     model: str = "gpt-4o-mini",
-    encoding: str = "gpt-4"
+    encoding: str = "gpt-4",
+    semaphore: Optional[asyncio.Semaphore] = None,
+    use_cache: bool = True,
+    get_document_prompt: Optional[Callable[[str], str]] = None,
+    summary_questions: Optional[List[str]] = None,
+    cache_control: bool = False
 ) -> None:
     """
     Summarize a single document with multiple question-focused prompts.
     
     Args:
-        client: OpenAI client instance
+        client: AsyncOpenAI client instance
         doc_text: Document text to summarize
         doc_name: Name of the document (without extension)
         output_dir: Directory to save summaries
         get_prompts_func: Function that takes doc_text and returns list of prompts
+                          (unused when get_document_prompt is given)
         system_prompt: System prompt for the LLM
         max_tokens: Maximum context window size
         safety_margin: Tokens to reserve for system messages
         model: Model to use for summarization
         encoding: Encoding model to use
+        semaphore: Limits requests in flight (see perform_summarization)
+        use_cache: Reuse cached responses (see perform_summarization)
+        get_document_prompt: Function that takes doc_text and returns a prompt
+                             sent once before each of summary_questions, so
+                             the document is a cacheable shared prefix
+        summary_questions: Question prompts without the document, used with
+                           get_document_prompt
+        cache_control: Add prompt cache breakpoints (see _summary_messages)
     """
-    # Step 1: Estimate what doc_prompts would look like for a chunk of doc_text
-    # Temporarily build prompts with the full doc_text
-    temp_doc_prompts = get_prompts_func(doc_text)
-    # Calculate maximum allowed tokens in doc_text (subtracting prompt overhead and margin)
-    max_allowed_tokens = available_tokens_for_doc(
-        temp_doc_prompts, 
-        max_tokens=max_tokens, 
-        safety_margin=safety_margin,
-        encoding=encoding
-    )
+    # Tokenizing a long document is CPU work; keep it off the event loop so
+    # other documents' requests keep flowing
+    if get_document_prompt is not None:
+        shared_prompt = await asyncio.to_thread(
+            prepare_document_prompt, doc_text, get_document_prompt, summary_questions,
+            max_tokens, safety_margin, encoding
+        )
+        doc_prompts = summary_questions
+    else:
+        shared_prompt = None
+        doc_prompts = await asyncio.to_thread(
+            prepare_prompts, doc_text, get_prompts_func, max_tokens, safety_margin, encoding
+        )
+    # Save each summary as a separate file as soon as it arrives, in a staging
+    # folder that is moved into place once all succeed, so a document whose
+    # summary folder exists is always complete (main skips those)
+    # Note: summary indices start from 2 (question_2, question_3, etc.)
+    doc_summary_folder = output_dir / doc_name
+    partial_folder = output_dir / f"{doc_name}.partial"
+    # Created up front so the move below works even when no prompts were produced
+    partial_folder.mkdir(parents=True, exist_ok=True)
     
-    # Step 2: Actually truncate doc_text to fit
-    doc_text = truncate_text_to_token_limit(doc_text, max_allowed_tokens, encoding)
+    async def save_summary(idx: int, summary: str) -> None:
+        await _write_text(partial_folder / f"question_{idx + 2}_summary.txt", summary)
     
-    # Step 3: Build prompts again (using truncated doc_text)
-    doc_prompts = get_prompts_func(doc_text)
-    doc_summaries = perform_summarization(client, doc_prompts, system_prompt, model)
+    doc_summaries = await perform_summarization(
+        client, doc_prompts, system_prompt, model, semaphore, use_cache, shared_prompt, cache_control,
+        on_summary=save_summary
+    )
+    print(f"  ✓ Generated {len(doc_summaries)} summaries for {doc_name}")
     
-    # Create subfolder for document summary
-    doc_summary_folder = output_dir / doc_name
     doc_summary_folder.mkdir(parents=True, exist_ok=True)
+    for summary_path in partial_folder.iterdir():
+        os.replace(summary_path, doc_summary_folder / summary_path.name)
+    partial_folder.rmdir()
+
+
+async def summarize_documents(
+    client: AsyncOpenAI,
+    doc_paths: List[Path],
+    output_dir: Path,
+    get_prompts_func,
+    system_prompt: str,
+    max_tokens: int = 128000,
+    safety_margin: int = 1024,
+    model: str = "gpt-4o-mini",
+    concurrency: int = 10,
+    doc_concurrency: int = 4,
+    use_cache: bool = True,
+    get_document_prompt: Optional[Callable[[str], str]] = None,
+    summary_questions: Optional[List[str]] = None,
+    cache_control: bool = False,
+    requests_per_minute: Optional[float] = None
+) -> int:
+    """
+    Summarize many documents, several at a time, sharing one request limit.
     
-    # Save each summary as a separate file inside the subfolder
-    # Note: summary indices start from 2 (question_2, question_3, etc.)
-    for idx, summary in enumerate(doc_summaries, start=2):
-        summary_filename = f"question_{idx}_summary.txt"
-        summary_path = doc_summary_folder / summary_filename
-        summary_path.write_text(summary, encoding="utf-8")
+    Args:
+        client: AsyncOpenAI client instance
+        doc_paths: Text files to summarize
+        output_dir: Directory to save summaries
+        get_prompts_func: Function that takes doc_text and returns list of prompts
+        system_prompt: System prompt for the LLM
+        max_tokens: Maximum context window size
+        safety_margin: Tokens to reserve for system messages
+        model: Model to use for summarization
+        concurrency: Maximum number of requests in flight across all documents
+        doc_concurrency: Maximum number of documents in progress
+        use_cache: Reuse cached responses (see perform_summarization)
+        get_document_prompt: Shared document prompt builder (see summarize_document)
+        summary_questions: Question prompts used with get_document_prompt
+        cache_control: Add prompt cache breakpoints (see _summary_messages)
+        requests_per_minute: Maximum number of LLM requests started per minute
+                             (default: unlimited); cached responses do not count
+    
+    Returns:
+        Number of documents summarized successfully
+    """
+    if requests_per_minute:
+        semaphore = RateLimitedSemaphore(concurrency, requests_per_minute)
+    else:
+        semaphore = asyncio.Semaphore(concurrency)
+    queue: asyncio.Queue = asyncio.Queue()
+    for doc_path in doc_paths:
+        queue.put_nowait(doc_path)
+    successful = 0
+    
+    async def worker():
+        nonlocal successful
+        while not queue.empty():
+            doc_path = queue.get_nowait()
+            doc_name = doc_path.stem
+            print(f"Processing {doc_name}...")
+            try:
+                doc_text = read_document(doc_path, max_tokens)
+                await summarize_document(
+                    client=client,
+                    doc_text=doc_text,
+                    doc_name=doc_name,
+                    output_dir=output_dir,
+                    get_prompts_func=get_prompts_func,
+                    system_prompt=system_prompt,
+                    max_tokens=max_tokens,
+                    safety_margin=safety_margin,
+                    model=model,
+                    semaphore=semaphore,
+                    use_cache=use_cache,
+                    get_document_prompt=get_document_prompt,
+                    summary_questions=summary_questions,
+                    cache_control=cache_control
+                )
+                successful += 1
+                print(f"  ✅ Completed {doc_name}\n")
+            except Exception as e:
+                print(f"  ❌ Error processing {doc_name}: {e}\n")
+    
+    await asyncio.gather(*(worker() for _ in range(max(1, doc_concurrency))))
+    return successful
 
 
 def main():
@@ -186,6 +636,8 @@ Examples:
 Note: This script requires a prompts module that provides:
   - SYSTEM_PROMPT: System prompt for the LLM
   - get_all_prompts(doc_text): Function that returns a list of prompts
+Optionally, get_document_prompt(doc_text) and get_summary_questions() send
+the document once as a shared prefix before each question (used if present).
   
 See prompts_example.py in the analysis folder for an example implementation.
         """
@@ -222,6 +674,44 @@ See prompts_example.py in the analysis folder for an example implementation.
         default="gpt-4o-mini",
         help="Model to use for summarization (default: gpt-4o-mini)"
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=10,
+        help="Maximum number of LLM requests in flight (default: 10)"
+    )
+    parser.add_argument(
+        "--doc-concurrency",
+        type=int,
+        default=4,
+        help="Maximum number of documents summarized at the same time (default: 4)"
+    )
+    parser.add_argument(
+        "--requests-per-minute",
+        type=float,
+        default=None,
+        help="Maximum number of LLM requests started per minute, to stay under the "
+             "provider's rate limit (default: unlimited)"
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=6,
+        help="Maximum retries per request on rate limits (429), server errors and "
+             "timeouts, with exponential backoff (default: 6)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always call the LLM instead of reusing responses cached under "
+             "$VECTORLAW_CACHE_DIR/responses (default: ~/.cache/vectorlaw)"
+    )
+    parser.add_argument(
+        "--cache-control",
+        action="store_true",
+        help="Mark the system prompt and document with Anthropic-style cache_control "
+             "breakpoints (for Anthropic models via OpenRouter)"
+    )
     parser.add_argument(
         "--no-skip-existing",
         action="store_true",
@@ -253,6 +743,15 @@ See prompts_example.py in the analysis folder for an example implementation.
     system_prompt = prompts_module.SYSTEM_PROMPT
     get_all_prompts = prompts_module.get_all_prompts
     
+    # Modules that can send the document separately from the questions get a
+    # shared, cacheable document prefix
+    get_document_prompt = getattr(prompts_module, "get_document_prompt", None)
+    summary_questions = None
+    if get_document_prompt is not None and hasattr(prompts_module, "get_summary_questions"):
+        summary_questions = prompts_module.get_summary_questions()
+    else:
+        get_document_prompt = None
+    
     # Setup paths
     input_dir = Path(args.input).expanduser().resolve()
     output_dir = Path(args.output).expanduser().resolve()
@@ -262,18 +761,20 @@ See prompts_example.py in the analysis folder for an example implementation.
         raise FileNotFoundError(f"Input directory not found: {input_dir}")
     
     # Initialize OpenAI client
-    client = OpenAI(
+    # The client retries rate limits, 5xx responses, timeouts and connection
+    # errors with jittered exponential backoff, honoring Retry-After headers
+    client = AsyncOpenAI(
         api_key=OPENROUTER_API_KEY,
-        base_url="https://openrouter.ai/api/v1"
+        base_url="https://openrouter.ai/api/v1",
+        max_retries=args.max_retries
     )
     
     # Get all text files
     all_docs = sorted([f for f in input_dir.glob("*.txt")])
     print(f"Found {len(all_docs)} documents to process")
     
-    successful = 0
     skipped = 0
-    
+    pending_docs = []
     for doc_path in all_docs:
         doc_name = doc_path.stem
         doc_summary_folder = output_dir / doc_name
@@ -282,25 +783,27 @@ See prompts_example.py in the analysis folder for an example implementation.
             print(f"Skipping {doc_name}: summary already exists")
             skipped += 1
             continue
-        
-        print(f"Processing {doc_name}...")
-        try:
-            doc_text = doc_path.read_text(encoding="utf-8")
-            summarize_document(
-                client=client,
-                doc_text=doc_text,
-                doc_name=doc_name,
-                output_dir=output_dir,
-                get_prompts_func=get_all_prompts,
-                system_prompt=system_prompt,
-                max_tokens=args.max_tokens,
-                safety_margin=args.safety_margin,
-                model=args.model
-            )
-            successful += 1
-            print(f"  ✅ Completed {doc_name}\n")
-        except Exception as e:
-            print(f"  ❌ Error processing {doc_name}: {e}\n")
+        pending_docs.append(doc_path)
+    
+    # Requests are network-bound, so all prompts of a document, and several
+    # documents, are in flight at once
+    successful = asyncio.run(summarize_documents(
+        client=client,
+        doc_paths=pending_docs,
+        output_dir=output_dir,
+        get_prompts_func=get_all_prompts,
+        system_prompt=system_prompt,
+        max_tokens=args.max_tokens,
+        safety_margin=args.safety_margin,
+        model=args.model,
+        concurrency=args.concurrency,
+        doc_concurrency=args.doc_concurrency,
+        use_cache=not args.no_cache,
+        get_document_prompt=get_document_prompt,
+        summary_questions=summary_questions,
+        cache_control=args.cache_control,
+        requests_per_minute=args.requests_per_minute
+    ))
     
     print(f"\n✅ Summarization complete!")
     print(f"   - Successful: {successful}")
@@ -6,10 +6,14 @@ This script provides functions for detecting languages in text and translating
 non-English text to English. Supports both full translation and English-only filtering.
 """
 
+import os
 import re
 import time
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 
 from langdetect import detect, DetectorFactory
 from nltk import sent_tokenize
@@ -23,6 +27,104 @@ except ImportError:
     HAS_TRANSLATOR = False
     print("Warning: deep-translator not installed. Translation features will be unavailable.")
 
+# httpx enables the asynchronous Google Cloud Translation backend
+# (GOOGLE_TRANSLATE_API_KEY); with h2 installed it speaks HTTP/2
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+
+try:
+    import h2  # noqa: F401 (required by httpx for HTTP/2)
+    HAS_H2 = True
+except ImportError:
+    HAS_H2 = False
+
+try:
+    import fasttext
+    HAS_FASTTEXT = True
+except ImportError:
+    HAS_FASTTEXT = False
+
+# fastText language identification model (lid.176.bin, or the compressed
+# lid.176.ftz, from https://fasttext.cc/docs/en/language-identification.html).
+# It is used for detection when fasttext is installed and the file exists;
+# otherwise langdetect is used.
+LID_MODEL_PATH = Path(
+    os.getenv("VECTORLAW_LID_MODEL", "~/.cache/vectorlaw/lid.176.ftz")
+).expanduser()
+
+
+@functools.lru_cache(maxsize=1)
+def _load_lid_model():
+    """Load the fastText language identification model once, or return None if unavailable."""
+    if not HAS_FASTTEXT or not LID_MODEL_PATH.exists():
+        return None
+    return fasttext.load_model(str(LID_MODEL_PATH))
+
+
+def _detect(text: str) -> str:
+    """Detect the language of a text with fastText if available, else langdetect."""
+    model = _load_lid_model()
+    if model is None:
+        return detect(text)
+    # predict() rejects newlines; labels look like '__label__en'
+    labels, _ = model.predict(text.replace('\n', ' '), k=1)
+    return labels[0][len('__label__'):]
+
+
+def _detect_batch(texts: List[str]) -> List[Optional[str]]:
+    """
+    Detect the language of many texts, with one fastText call if available.
+    
+    Returns:
+        Language code per text, or None where langdetect failed
+    """
+    model = _load_lid_model()
+    if model is None:
+        detected = []
+        for text in texts:
+            try:
+                detected.append(detect(text))
+            except Exception:
+                detected.append(None)
+        return detected
+    if not texts:
+        return []
+    labels, _ = model.predict([text.replace('\n', ' ') for text in texts], k=1)
+    return [text_labels[0][len('__label__'):] for text_labels in labels]
+
+
+# Common English function words that rarely appear in other languages' prose
+# (notably Portuguese, Spanish and French, which are also mostly ASCII)
+_ENGLISH_MARKERS = frozenset({
+    "the", "and", "of", "to", "is", "are", "were", "be", "been", "have", "with",
+    "that", "this", "which", "for", "from", "by", "its", "it", "will", "shall",
+    "at", "not", "these", "their", "such"
+})
+_ASCII_WORD_RE = re.compile(r"[a-z]+")
+
+
+def _is_obviously_english(sentence: str) -> bool:
+    """
+    Cheap check that accepts clearly English sentences without running langdetect.
+    
+    The sentence must be at least 95% ASCII, and at least a fifth of its words
+    (and two or more) must be English function words. ASCII alone is not
+    enough: unaccented Portuguese, Spanish or French is mostly ASCII too.
+    Anything that fails the check goes through langdetect as before.
+    """
+    if len(sentence.encode("ascii", "ignore")) < 0.95 * len(sentence):
+        return False
+    words = _ASCII_WORD_RE.findall(sentence.lower())
+    markers = sum(1 for word in words if word in _ENGLISH_MARKERS)
+    return markers >= 2 and markers * 5 >= len(words)
+
+
+# A Chinese sentence: text up to and including a sentence-ending mark, or up to a line break
+_CHINESE_SENTENCE_RE = re.compile(r'[^。！？!?；\n]+[。！？!?；]?')
+
 
 def chinese_sent_tokenize(text: str) -> list:
     """
@@ -30,16 +132,9 @@ def chinese_sent_tokenize(text: str) -> list:
     Chinese uses different punctuation: 。(period), ！(exclamation), ？(question mark)
     Also handles some English-style punctuation mixed in Chinese text.
     """
-    # Replace Chinese punctuation with placeholder + newline for splitting
-    text = re.sub(r'([。！？!?；])', r'\1\n', text)
-    
-    # Split by newlines and filter out empty strings
-    sentences = [s.strip() for s in text.split('\n') if s.strip()]
-    
+    sentences = (match.group().strip() for match in _CHINESE_SENTENCE_RE.finditer(text))
     # Filter out very short "sentences" that are likely headers or page numbers
-    sentences = [s for s in sentences if len(s) > 3]
-    
-    return sentences
+    return [s for s in sentences if len(s) > 3]
 
 
 def smart_sent_tokenize(text: str, language: str = 'auto') -> list:
@@ -71,7 +166,7 @@ def detect_language(text: str, sample_size: int = 1000) -> str:
     
     # Use a sample for faster detection
     sample = text[:sample_size] if len(text) > sample_size else text
-    return detect(sample)
+    return _detect(sample)
 
 
 def filter_english_sentences(text: str) -> Optional[str]:
@@ -89,31 +184,22 @@ def filter_english_sentences(text: str) -> Optional[str]:
     if not text or not isinstance(text, str) or len(text.strip()) == 0:
         return None
     
-    # Tokenize text into sentences
-    sentences = sent_tokenize(text)
-    english_sentences = []
+    # Tokenize text into sentences, skipping empty ones
+    sentences = [sentence.strip() for sentence in sent_tokenize(text)]
+    sentences = [sentence for sentence in sentences if sentence]
     
-    for sentence in sentences:
-        sentence = sentence.strip()
-        
-        # Skip empty sentences
-        if not sentence:
-            continue
-        
-        # Skip very short sentences (likely headers, page numbers, etc.)
-        if len(sentence) < 10:
-            english_sentences.append(sentence)  # Keep short text as-is
-            continue
-        
-        try:
-            # Detect language of this sentence
-            detected_lang = detect(sentence)
-            
-            if detected_lang == 'en':
-                english_sentences.append(sentence)
-        except Exception:
-            # If detection fails, keep the sentence (conservative approach)
-            english_sentences.append(sentence)
+    # Very short sentences (likely headers, page numbers, etc.) are kept as-is,
+    # and most sentences in an English corpus are plainly English; detect the rest
+    # in one batch
+    to_detect = [
+        i for i, sentence in enumerate(sentences)
+        if len(sentence) >= 10 and not _is_obviously_english(sentence)
+    ]
+    keep = [True] * len(sentences)
+    for i, detected_lang in zip(to_detect, _detect_batch([sentences[i] for i in to_detect])):
+        # If detection fails, keep the sentence (conservative approach)
+        keep[i] = detected_lang is None or detected_lang == 'en'
+    english_sentences = [sentence for sentence, kept in zip(sentences, keep) if kept]
     
     # Join the English sentences back together
     filtered_text = ' '.join(english_sentences)
@@ -139,60 +225,231 @@ def map_language_code(lang: str) -> str:
     return language_map.get(lang.lower(), lang)
 
 
+# Google Translate rejects requests of 5000 characters or more
+TRANSLATE_BATCH_CHARS = 4500
+
+# Google Cloud Translation (v2) endpoint, used instead of deep-translator when
+# GOOGLE_TRANSLATE_API_KEY is set; it accepts at most 128 segments per request
+CLOUD_TRANSLATE_URL = "https://translation.googleapis.com/language/translate/v2"
+CLOUD_TRANSLATE_MAX_SEGMENTS = 128
+
+
+def _batch_sentences(
+    sentences: List[str],
+    max_chars: int = TRANSLATE_BATCH_CHARS,
+    max_sentences: Optional[int] = None
+) -> List[List[str]]:
+    """Group consecutive sentences into batches of at most max_chars characters joined by newlines."""
+    batches = []
+    batch = []
+    size = 0
+    for sentence in sentences:
+        if batch and (size + len(sentence) > max_chars or len(batch) == max_sentences):
+            batches.append(batch)
+            batch = []
+            size = 0
+        batch.append(sentence)
+        size += len(sentence) + 1
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _translate_batch(batch: List[str], source_lang: str, target_lang: str) -> List[str]:
+    """
+    Translate a batch of sentences in one request, one sentence per line.
+    
+    If the batch request fails, each sentence is retried on its own so that
+    only the failing ones are kept untranslated.
+    """
+    # GoogleTranslator keeps request state on the instance, so each batch
+    # (and thread) gets its own
+    try:
+        translator = GoogleTranslator(source=source_lang, target=target_lang)
+    except Exception as e:
+        # The constructor validates the language codes (e.g. rejects 'zh-cn')
+        print(f"Translation error for batch of {len(batch)} sentences: {e}")
+        # Keep original sentences on error
+        return list(batch)
+    if len(batch) > 1:
+        try:
+            translated = translator.translate('\n'.join(batch))
+            if translated:
+                return [line.strip() for line in translated.split('\n') if line.strip()]
+        except Exception as e:
+            print(f"Translation error for batch of {len(batch)} sentences, retrying one by one: {e}")
+    
+    translated_sentences = []
+    for sentence in batch:
+        try:
+            translated_sentences.append(translator.translate(sentence) or sentence)
+        except Exception as e:
+            print(f"Translation error for sentence: {e}")
+            # Keep original sentence on error
+            translated_sentences.append(sentence)
+    return translated_sentences
+
+
+def _cloud_translate_key() -> Optional[str]:
+    """API key for the Cloud Translation backend, or None to use deep-translator."""
+    return os.getenv("GOOGLE_TRANSLATE_API_KEY") if HAS_HTTPX else None
+
+
+def _sentences_to_translate(
+    text: str,
+    source_lang: Optional[str],
+    detect_source: bool
+) -> Tuple[Optional[str], Optional[List[str]]]:
+    """
+    Detect the source language if needed and split text into sentences.
+    
+    Returns:
+        Tuple of (source language, sentences); sentences is None if the text
+        is invalid or detection failed
+    """
+    if not text or not isinstance(text, str) or len(text.strip()) == 0:
+        return source_lang, None
+    
+    # Detect source language if needed
+    if detect_source and source_lang is None:
+        try:
+            detected_lang = detect_language(text)
+            source_lang = map_language_code(detected_lang)
+        except Exception as e:
+            print(f"Language detection failed: {e}")
+            return None, None
+    
+    # Use language-aware tokenization
+    tokenized_text = smart_sent_tokenize(text, source_lang)
+    return source_lang, [sentence.strip() for sentence in tokenized_text if sentence.strip()]
+
+
+async def _translate_batch_cloud(
+    client: "httpx.AsyncClient",
+    semaphore: asyncio.Semaphore,
+    batch: List[str],
+    source_lang: str,
+    target_lang: str,
+    api_key: str
+) -> List[str]:
+    """Translate a batch of sentences with one Cloud Translation request; originals are kept on error."""
+    async with semaphore:
+        try:
+            response = await client.post(
+                CLOUD_TRANSLATE_URL,
+                params={"key": api_key},
+                json={"q": batch, "source": source_lang, "target": target_lang, "format": "text"}
+            )
+            response.raise_for_status()
+            return [t["translatedText"] for t in response.json()["data"]["translations"]]
+        except Exception as e:
+            print(f"Translation error for batch of {len(batch)} sentences: {e}")
+            return batch
+
+
+async def translate_text_async(
+    text: str,
+    source_lang: Optional[str] = None,
+    target_lang: str = 'en',
+    detect_source: bool = True,
+    concurrency: int = 10
+) -> Optional[str]:
+    """
+    Translate text to English (or another target language) with concurrent batch requests.
+    
+    With GOOGLE_TRANSLATE_API_KEY set (and httpx installed), batches are sent
+    to Google Cloud Translation over one async HTTP client. Otherwise the
+    deep-translator batches of translate_text run in threads.
+    
+    Args:
+        text: Text to translate
+        source_lang: Source language code (e.g., 'pt', 'zh', 'fr'). If None, will be detected.
+        target_lang: Target language code (default: 'en')
+        detect_source: If True and source_lang is None, automatically detect source language
+        concurrency: Maximum number of batch requests in flight
+    
+    Returns:
+        Translated text, or None if translation fails or text is invalid
+    """
+    api_key = _cloud_translate_key()
+    if not api_key and not HAS_TRANSLATOR:
+        raise ImportError("deep-translator is required for translation. Install it with: pip install deep-translator")
+    
+    source_lang, sentences = _sentences_to_translate(text, source_lang, detect_source)
+    if sentences is None:
+        return None
+    # If already in target language, return as-is
+    if source_lang == target_lang:
+        return text
+    
+    semaphore = asyncio.Semaphore(concurrency)
+    if api_key:
+        batches = _batch_sentences(sentences, max_sentences=CLOUD_TRANSLATE_MAX_SEGMENTS)
+        async with httpx.AsyncClient(http2=HAS_H2, timeout=30) as client:
+            results = await asyncio.gather(*(
+                _translate_batch_cloud(client, semaphore, batch, source_lang, target_lang, api_key)
+                for batch in batches
+            ))
+    else:
+        async def translate_in_thread(batch: List[str]) -> List[str]:
+            async with semaphore:
+                return await asyncio.to_thread(_translate_batch, batch, source_lang, target_lang)
+        
+        results = await asyncio.gather(*(translate_in_thread(batch) for batch in _batch_sentences(sentences)))
+    
+    translated_sentences = [sentence for translated in results for sentence in translated]
+    return ' '.join(translated_sentences) if translated_sentences else None
+
+
 def translate_text(
     text: str,
     source_lang: Optional[str] = None,
     target_lang: str = 'en',
-    detect_source: bool = True
+    detect_source: bool = True,
+    max_workers: int = 4
 ) -> Optional[str]:
     """
     Translate text to English (or another target language).
     
+    Sentences are sent in batches of up to TRANSLATE_BATCH_CHARS characters,
+    several batches at a time, instead of one request per sentence. With
+    GOOGLE_TRANSLATE_API_KEY set, this runs translate_text_async (from async
+    code, await that directly instead).
+    
     Args:
         text: Text to translate
         source_lang: Source language code (e.g., 'pt', 'zh', 'fr'). If None, will be detected.
         target_lang: Target language code (default: 'en')
         detect_source: If True and source_lang is None, automatically detect source language
+        max_workers: Number of batches translated concurrently
     
     Returns:
         Translated text, or None if translation fails or text is invalid
     """
+    if _cloud_translate_key():
+        return asyncio.run(translate_text_async(text, source_lang, target_lang, detect_source))
+    
     if not HAS_TRANSLATOR:
         raise ImportError("deep-translator is required for translation. Install it with: pip install deep-translator")
     
-    if not text or not isinstance(text, str) or len(text.strip()) == 0:
+    source_lang, sentences = _sentences_to_translate(text, source_lang, detect_source)
+    if sentences is None:
         return None
-    
-    # Detect source language if needed
-    if detect_source and source_lang is None:
-        try:
-            detected_lang = detect_language(text)
-            source_lang = map_language_code(detected_lang)
-        except Exception as e:
-            print(f"Language detection failed: {e}")
-            return None
-    
     # If already in target language, return as-is
     if source_lang == target_lang:
         return text
     
-    # Use language-aware tokenization
-    tokenized_text = smart_sent_tokenize(text, source_lang)
+    batches = _batch_sentences(sentences)
     
-    # Translate sentences one by one
+    # Translation is network-bound; send several batches at a time
     translated_sentences = []
-    for sentence in tokenized_text:
-        sentence = sentence.strip()
-        if not sentence:
-            continue
-        
-        try:
-            translated = GoogleTranslator(source=source_lang, target=target_lang).translate(sentence)
-            translated_sentences.append(translated)
-        except Exception as e:
-            print(f"Translation error for sentence: {e}")
-            # Keep original sentence on error
-            translated_sentences.append(sentence)
+    if len(batches) <= 1 or max_workers <= 1:
+        for batch in batches:
+            translated_sentences.extend(_translate_batch(batch, source_lang, target_lang))
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+            for translated in executor.map(lambda batch: _translate_batch(batch, source_lang, target_lang), batches):
+                translated_sentences.extend(translated)
     
     return ' '.join(translated_sentences) if translated_sentences else None
 
@@ -231,7 +488,7 @@ def process_text(
         return processed, detected_lang
     
     if mode == 'translate' or (mode == 'auto' and detected_lang != 'en'):
-        if not HAS_TRANSLATOR:
+        if not HAS_TRANSLATOR and not _cloud_translate_key():
             print("Warning: Translation requested but deep-translator not available. Returning original text.")
             return text, detected_lang
         processed = translate_text(text, source_lang=detected_lang, detect_source=False)